@@ -0,0 +1,194 @@
+"""Measure LLM-call throughput with and without the micro-batching dispatcher.
+
+Simulates ``--requests`` concurrent knowledge queries, each making the
+grader-side calls of one pass through the graph (route, grade
+``--documents`` chunks, grounding and usefulness checks) through the real
+prompts and chains. The LLM is an in-process stand-in for an Ollama server
+with ``--slots`` parallel slots (``OLLAMA_NUM_PARALLEL``) and a fixed
+per-call latency; in ``native`` mode a batch of k prompts holds one slot for
+``latency * (1 + batch_cost * (k - 1))``.
+
+Run from ``api/``::
+
+    uv run python benchmarks/dispatch_benchmark.py --requests 32 --slots 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from langchain_core.callbacks import (  # noqa: E402
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.llms import LLM  # noqa: E402
+from langchain_core.outputs import Generation, LLMResult  # noqa: E402
+
+from aptify_api.services.rag.chains import (  # noqa: E402
+    build_answer_grader,
+    build_hallucination_grader,
+    build_question_router,
+    build_retrieval_grader,
+)
+from aptify_api.utils.llm_dispatch import LLMDispatcher  # noqa: E402
+
+CHUNK = (
+    "The lessor must lodge the rental bond with the authority within ten days. "
+    "Entry to the premises requires a Form 9 entry notice. "
+) * 8
+
+
+class SlottedServerLLM(LLM):
+    """Ollama-like stand-in: ``slots`` calls run at once, the rest queue."""
+
+    latency_ms: float = 200.0
+    batch_cost: float = 0.15
+    slots: int = 4
+    semaphore: Any = None
+
+    def model_post_init(self, __context: Any) -> None:
+        self.semaphore = threading.BoundedSemaphore(self.slots)
+
+    @property
+    def _llm_type(self) -> str:
+        return "slotted-server"
+
+    @staticmethod
+    def _answer(prompt: str) -> str:
+        if "routing a user question" in prompt:
+            return json.dumps({"datasource": "vectorstore"})
+        return json.dumps({"score": "yes"})
+
+    def _hold_slot(self, calls: int) -> None:
+        with self.semaphore:
+            time.sleep(self.latency_ms / 1000 * (1 + self.batch_cost * (calls - 1)))
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        self._hold_slot(1)
+        return self._answer(prompt)
+
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        # One server round trip for the whole list (used by native batching).
+        self._hold_slot(len(prompts))
+        return LLMResult(
+            generations=[[Generation(text=self._answer(prompt))] for prompt in prompts]
+        )
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        # Without a dispatcher, ``abatch`` sends one request per prompt at
+        # once, as ChatOllama does; ``LLM`` would await them one by one.
+        texts = await asyncio.gather(
+            *(asyncio.to_thread(self._call, prompt, stop) for prompt in prompts)
+        )
+        return LLMResult(generations=[[Generation(text=text)] for text in texts])
+
+
+async def one_request(chains: dict, index: int, documents: int) -> float:
+    started = time.perf_counter()
+    question = f"Question {index}: when must the bond be lodged?"
+    await chains["router"].ainvoke({"question": question})
+    await chains["grader"].abatch(
+        [{"question": question, "documents": CHUNK} for _ in range(documents)],
+        config={"max_concurrency": documents},
+    )
+    await chains["hallucination"].ainvoke({"documents": CHUNK, "generation": "Ten days."})
+    await chains["answer"].ainvoke({"question": question, "generation": "Ten days."})
+    return time.perf_counter() - started
+
+
+async def run_mode(mode: str, args: argparse.Namespace) -> dict:
+    llm = SlottedServerLLM(
+        latency_ms=args.latency_ms, batch_cost=args.batch_cost, slots=args.slots
+    )
+    dispatcher = None
+    if mode == "direct":
+        def client(route: str) -> Any:
+            return llm
+    else:
+        dispatcher = LLMDispatcher(
+            llm,
+            window_ms=args.window_ms,
+            max_batch=args.max_batch,
+            max_concurrency=args.slots,
+            native_batch=mode == "native",
+        )
+        client = dispatcher.route
+    chains = {
+        "router": build_question_router(client("question_router")),
+        "grader": build_retrieval_grader(client("retrieval_grader")),
+        "hallucination": build_hallucination_grader(client("hallucination_grader")),
+        "answer": build_answer_grader(client("answer_grader")),
+    }
+    started = time.perf_counter()
+    latencies = await asyncio.gather(
+        *(one_request(chains, index, args.documents) for index in range(args.requests))
+    )
+    wall = time.perf_counter() - started
+    calls = args.requests * (3 + args.documents)
+    result = {
+        "mode": mode,
+        "wall_s": round(wall, 2),
+        "calls_per_s": round(calls / wall, 1),
+        "p50_ms": round(1000 * statistics.median(latencies)),
+        "p95_ms": round(1000 * sorted(latencies)[round(0.95 * (len(latencies) - 1))]),
+    }
+    if dispatcher is not None:
+        result["mean_batch_size"] = round(dispatcher.stats()["mean_batch_size"], 2)
+        dispatcher.close()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--batch-cost", type=float, default=0.15)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument(
+        "--modes", nargs="+", default=["direct", "pool", "native"],
+        choices=["direct", "pool", "native"],
+    )
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'wall s':>7} {'calls/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'batch':>6}")
+    for mode in args.modes:
+        row = asyncio.run(run_mode(mode, args))
+        print(
+            f"{row['mode']:<8} {row['wall_s']:>7.2f} {row['calls_per_s']:>8.1f} "
+            f"{row['p50_ms']:>7} {row['p95_ms']:>7} {row.get('mean_batch_size', '-'):>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
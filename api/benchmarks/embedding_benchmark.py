@@ -0,0 +1,98 @@
+"""Compare embedding-pipeline settings on a synthetic PDF corpus.
+
+Builds a fresh Chroma store for each batch-size/thread/worker combination and
+prints chunks/sec, which is the number to use when sizing build machines.
+The embedding cache is turned off, so every combination runs the model.
+
+Run from ``api/``::
+
+    uv run python benchmarks/embedding_benchmark.py --pdfs 100 \\
+        --batch-sizes 32 128 --threads 1 4 --workers 0 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# With the cache every run after the first would time cache reads, and the
+# synthetic chunks would end up in the real on-disk cache.
+os.environ["EMBED_CACHE"] = "0"
+
+from startup_benchmark import build_corpus  # noqa: E402
+
+from aptify_api.utils.embedding_pipeline import (  # noqa: E402
+    PipelineConfig,
+    run_pipeline,
+)
+from aptify_api.utils.init_vector_db import (  # noqa: E402
+    collection_name,
+    get_embeddings,
+    scan_corpus,
+    split_documents,
+    upsert_embedded,
+)
+
+
+def parse_corpus(corpus: Path):
+    from langchain_community.document_loaders import PyPDFLoader
+
+    for source, digest in scan_corpus(str(corpus)).items():
+        splits = split_documents(PyPDFLoader(source).load())
+        yield source, [f"{digest[:16]}#{i}" for i in range(len(splits))], splits
+
+
+def main() -> None:
+    from langchain_chroma import Chroma
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[32, 128])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--workers", type=int, nargs="+", default=[0])
+    args = parser.parse_args()
+
+    embeddings = get_embeddings()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = Path(workdir) / "documents"
+        corpus.mkdir()
+        build_corpus(corpus, args.pdfs, args.pages)
+
+        runs = itertools.product(args.batch_sizes, args.threads, args.workers)
+        for index, (batch_size, threads, workers) in enumerate(runs):
+            config = PipelineConfig(
+                batch_size=batch_size, num_threads=threads, num_workers=workers
+            )
+            store_dir = Path(workdir) / f"chroma-{index}"
+            vectorstore = Chroma(
+                persist_directory=str(store_dir),
+                embedding_function=embeddings,
+                collection_name=collection_name(),
+            )
+            stats = run_pipeline(
+                partial(upsert_embedded, vectorstore),
+                embeddings,
+                parse_corpus(corpus),
+                config,
+            )
+            results.append((batch_size, threads, workers, stats))
+
+    print(f"\n{'batch':>6} {'threads':>8} {'workers':>8} {'chunks':>8} {'chunks/s':>10}")
+    for batch_size, threads, workers, run in results:
+        print(
+            f"{batch_size:>6} {threads:>8} {workers:>8} "
+            f"{run.chunks:>8} {run.chunks_per_second:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Measure throughput and peak memory of the streaming NDJSON export.
+
+Fills a payments repository on each backend, then drains the export stream
+(optionally gzipped) and reports records/s, output size and the peak memory
+allocated while exporting (``tracemalloc``, excluding the stored records).
+For comparison it also encodes the same collection as one JSON array, which
+is what a list endpoint returning everything at once would buffer.
+
+Run from ``api/``::
+
+    uv run python benchmarks/export_benchmark.py --records 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Iterable, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aptify_api.state import MemoryState  # noqa: E402
+from aptify_api.storage import MemoryBackend, SQLiteBackend, Storage  # noqa: E402
+from aptify_api.storage.export import (  # noqa: E402
+    gzip_chunks,
+    ndjson_chunks,
+    parse_timestamp,
+)
+
+
+def make_record(index: int) -> dict:
+    return {
+        "id": f"pay_{index:08d}",
+        "tenant_id": f"tenant_{index % 500}",
+        "amount": 1000 + index % 997,
+        "status": ("scheduled", "received", "failed")[index % 3],
+        "due_date": "2025-01-01",
+        "method": "card",
+        "created_at": f"2025-01-01T00:00:00.{index:06d}Z",
+        "updated_at": f"2025-01-01T00:00:00.{index:06d}Z",
+    }
+
+
+def measure(produce: Callable[[], Iterable[bytes]]) -> Tuple[float, int, int]:
+    """Drain ``produce()``; return (seconds, bytes written, peak bytes allocated).
+
+    Timing and memory come from separate passes, as tracing slows allocation.
+    """
+
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in produce())
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    for _ in produce():
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def run_backend(name: str, storage: Storage, args: argparse.Namespace) -> None:
+    repository = storage.payments
+    repository.put_many(make_record(index) for index in range(args.records))
+    storage.flush()
+    cutoff = make_record(args.records - args.records // 10)["updated_at"]
+    since = parse_timestamp(cutoff)
+    cases = {
+        "json array": lambda: [json.dumps(list(repository.values())).encode()],
+        "ndjson": lambda: ndjson_chunks(repository.values()),
+        "ndjson gzip": lambda: gzip_chunks(ndjson_chunks(repository.values())),
+        "ndjson since": lambda: ndjson_chunks(repository.values(), since=since),
+    }
+    for case, produce in cases.items():
+        elapsed, size, peak = measure(produce)
+        print(
+            f"{name:<8} {case:<13} {args.records / elapsed:>11,.0f} rec/s"
+            f"  {size / 2**20:>8.1f} MiB out  {peak / 2**20:>8.1f} MiB peak"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "sqlite"], choices=["memory", "sqlite"]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            if backend == "memory":
+                storage = Storage(MemoryBackend(MemoryState()))
+            else:
+                storage = Storage(SQLiteBackend(os.path.join(tmp, "export.sqlite3")))
+            try:
+                run_backend(backend, storage, args)
+            finally:
+                storage.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Latency/RSS benchmark for the embedding backends.
+
+Compares the ONNX (fp32) and int8-quantised backends with the default torch
+``HuggingFaceEmbeddings`` path: per-query latency (p50/p95) and peak RSS,
+each backend measured in a fresh interpreter so only its own stack is
+loaded. Cosine parity with torch is asserted by
+``tests/test_onnx_embeddings.py``.
+
+Run from ``api/`` (needs ``aptify-api[onnx]``)::
+
+    uv run python benchmarks/onnx_benchmark.py --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+ONNX_MODULE = (
+    Path(__file__).resolve().parents[1] / "src/aptify_api/utils/onnx_embeddings.py"
+)
+
+QUESTIONS = [
+    "Who pays stamp duty on a tenancy agreement?",
+    "How long does the lessor have to lodge the rental bond?",
+    "What notice is needed before entering the premises?",
+    "Can the tenant end a fixed term lease early?",
+    "Who is responsible for routine repairs?",
+]
+
+LATENCY = """
+import importlib.util, json, resource, statistics, sys, time
+backend, queries, module_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+if backend == "torch":
+    from langchain_huggingface import HuggingFaceEmbeddings
+    model = HuggingFaceEmbeddings(model_name="{model}")
+else:
+    spec = importlib.util.spec_from_file_location("onnx_embeddings", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    model = module.OnnxEmbeddings("{model}", backend=backend)
+questions = {questions}
+model.embed_query(questions[0])
+samples = []
+for index in range(queries):
+    started = time.perf_counter()
+    model.embed_query(questions[index % len(questions)])
+    samples.append((time.perf_counter() - started) * 1000)
+samples.sort()
+print(json.dumps({{
+    "p50_ms": statistics.median(samples),
+    "p95_ms": samples[int(len(samples) * 0.95) - 1],
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+""".format(model=MODEL, questions=QUESTIONS)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'peak RSS MB':>12}")
+    for backend in ("torch", "onnx", "onnx-int8"):
+        output = subprocess.run(
+            [sys.executable, "-c", LATENCY, backend, str(args.queries), str(ONNX_MODULE)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{backend:<10} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+            f"{result['max_rss_mb']:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""Drive the corrective-RAG graph offline with a scripted LLM and web search.
+
+Retrieval runs for real against the Chroma store built from ``api/documents``
+(``DOCS_PATH``/``CHROMA_PATH`` apply as usual); every LLM call goes to an
+in-process stand-in that sleeps for ``--llm-latency-ms`` and answers from a
+script, and web search returns canned results. Reports end-to-end and
+per-node latency, LLM calls per question and loop counts over a fixed
+question set, so graph and prompt changes can be compared without Ollama or
+Tavily.
+
+Grader scripts are comma-separated answers. Retrieval-grader answers are
+picked by a hash of the graded chunk, so the same chunk always gets the same
+grade; the other graders cycle through their script per question::
+
+    uv run python benchmarks/rag_benchmark.py --llm-latency-ms 200 \\
+        --retrieval yes,no --hallucination no,yes --answer yes --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import zlib
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+# services.rag builds a TavilySearch on import; it is never called here.
+os.environ.setdefault("TAVILY_API_KEY", "offline-benchmark")
+
+from langchain_core.callbacks import (  # noqa: E402
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.llms import LLM  # noqa: E402
+from langchain_core.outputs import Generation, LLMResult  # noqa: E402
+
+from aptify_api.services.rag.chains import (  # noqa: E402
+    build_answer_grader,
+    build_generation_grader,
+    build_hallucination_grader,
+    build_question_rewriter,
+    build_question_router,
+    build_rag_chain,
+    build_retrieval_grader,
+)
+from aptify_api.services.rag.graph import build_workflow  # noqa: E402
+from aptify_api.utils.rag import RagBudget, RagGraphNodes  # noqa: E402
+from aptify_api.utils.registry import RESOURCES  # noqa: E402
+from aptify_api.utils.tracing import RagTrace  # noqa: E402
+from aptify_api.utils.web_search import StubWebSearch  # noqa: E402
+
+# (question, datasource the scripted router picks)
+QUESTIONS = [
+    ("Who pays stamp duty on a tenancy agreement?", "vectorstore"),
+    ("How much notice must a lessor give before entering the premises?", "vectorstore"),
+    ("When does the lessor have to lodge the rental bond?", "vectorstore"),
+    ("Can the rent be increased during a fixed term agreement?", "vectorstore"),
+    ("What is a Form 9 entry notice used for?", "vectorstore"),
+    ("Who is responsible for routine repairs and maintenance?", "vectorstore"),
+    ("How does a tenant end a periodic tenancy?", "vectorstore"),
+    ("What happens to the bond at the end of the tenancy?", "vectorstore"),
+    ("What is the current RBA cash rate?", "web_search"),
+    ("Which suburbs in Brisbane had the highest rent growth this year?", "web_search"),
+]
+
+# Prompt fragments that identify which chain is calling the LLM.
+ROLE_MARKERS = [
+    ("combined", "keys 'grounded' and 'useful'"),
+    ("router", "routing a user question"),
+    ("retrieval", "relevance of a retrieved document"),
+    ("hallucination", "grounded in / supported by"),
+    ("answer", "useful to resolve a question"),
+    ("rewriter", "question re-writer"),
+]
+
+
+class ScriptedLLM(LLM):
+    """Ollama stand-in: fixed latency, answers scripted per prompt type."""
+
+    latency_ms: float = 0.0
+    scripts: Dict[str, List[str]]
+    route_for: Dict[str, str]
+    cursor: Dict[str, int] = {}
+    calls: Counter = Counter()
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    @staticmethod
+    def role(prompt: str) -> str:
+        for role, marker in ROLE_MARKERS:
+            if marker in prompt:
+                return role
+        return "generate"
+
+    def reset(self) -> None:
+        """Restart the per-question scripts."""
+
+        self.cursor.clear()
+
+    def respond(self, prompt: str) -> str:
+        role = self.role(prompt)
+        self.calls[role] += 1
+        if role == "router":
+            datasource = next(
+                (route for asked, route in self.route_for.items() if asked in prompt),
+                "vectorstore",
+            )
+            return json.dumps({"datasource": datasource})
+        if role == "generate":
+            return "The lessor pays, per the retrieved documents."
+        if role == "rewriter":
+            return prompt.rsplit("initial question:", 1)[-1].split(".")[0].strip()
+        if role == "combined":
+            grounded = self.next_answer("hallucination")
+            return json.dumps({"grounded": grounded, "useful": self.next_answer("answer")})
+        if role == "retrieval":
+            script = self.scripts[role]
+            # Concurrent grading has no stable order; key on the chunk instead.
+            answer = script[zlib.crc32(prompt.encode("utf-8")) % len(script)]
+        else:
+            answer = self.next_answer(role)
+        return json.dumps({"score": answer})
+
+    def next_answer(self, role: str) -> str:
+        script = self.scripts[role]
+        index = self.cursor.get(role, 0)
+        self.cursor[role] = index + 1
+        return script[index % len(script)]
+
+    def _call(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return self.respond(prompt)
+
+    async def _acall(
+        self,
+        prompt: str,
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self.respond(prompt)
+
+    # ``LLM`` runs a list of prompts one ``_call`` after another, so a batch of
+    # k would cost k * latency; a real server answers them concurrently.
+    def _generate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        with ThreadPoolExecutor(max_workers=max(len(prompts), 1)) as pool:
+            texts = list(pool.map(lambda prompt: self._call(prompt, stop), prompts))
+        return LLMResult(generations=[[Generation(text=text)] for text in texts])
+
+    async def _agenerate(
+        self,
+        prompts: List[str],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> LLMResult:
+        texts = await asyncio.gather(*(self._acall(prompt, stop) for prompt in prompts))
+        return LLMResult(generations=[[Generation(text=text)] for text in texts])
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    llm = ScriptedLLM(
+        latency_ms=args.llm_latency_ms,
+        scripts={
+            "retrieval": args.retrieval.split(","),
+            "hallucination": args.hallucination.split(","),
+            "answer": args.answer.split(","),
+        },
+        route_for=dict(QUESTIONS),
+    )
+    rag_nodes = RagGraphNodes(
+        retriever=lambda: RESOURCES.retriever,
+        rag_chain=build_rag_chain(llm),
+        question_router=build_question_router(llm),
+        question_rewriter=build_question_rewriter(llm),
+        retrieval_grader=build_retrieval_grader(llm),
+        web_search_tool=StubWebSearch(latency_seconds=args.search_latency_ms / 1000),
+        hallucination_grader=build_hallucination_grader(llm),
+        answer_grader=build_answer_grader(llm),
+        generation_grader=build_generation_grader(llm),
+        generation_grading=args.generation_grading,
+        grading_concurrency=args.grader_concurrency,
+        budget=RagBudget(
+            max_rewrites=args.max_rewrites,
+            max_regenerations=args.max_regenerations,
+            deadline_seconds=args.deadline or None,
+        ),
+    )
+    app = build_workflow(rag_nodes).compile()
+
+    # Warm the retriever (model load, BM25 build) outside the timings.
+    await RESOURCES.retriever.ainvoke(QUESTIONS[0][0])
+
+    per_question = []
+    node_ms: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(args.repeat):
+        for question, route in QUESTIONS:
+            llm.reset()
+            trace = RagTrace()
+            final_state = await app.ainvoke(
+                rag_nodes.budget.initial_state(question),
+                config={"callbacks": [trace]},
+            )
+            trace.finish()
+            summary = trace.summary()
+            for span in summary["spans"]:
+                node_ms[span["name"]].append(span["duration_ms"])
+            per_question.append(
+                {
+                    "question": question,
+                    "route": route,
+                    "total_ms": summary["total_ms"],
+                    "llm_calls": summary["llm_calls"],
+                    "rewrites": final_state.get("rewrites", 0),
+                    "generations": final_state.get("generations", 0),
+                    "degraded_reason": final_state.get("degraded_reason"),
+                }
+            )
+
+    totals = [row["total_ms"] for row in per_question]
+    return {
+        "questions": len(per_question),
+        "end_to_end_ms": {
+            "p50": round(percentile(totals, 0.5), 2),
+            "p95": round(percentile(totals, 0.95), 2),
+            "mean": round(statistics.mean(totals), 2),
+        },
+        "llm_calls_per_question": round(
+            statistics.mean(row["llm_calls"] for row in per_question), 2
+        ),
+        "llm_calls_by_role": dict(llm.calls),
+        "mean_rewrites": round(statistics.mean(row["rewrites"] for row in per_question), 2),
+        "mean_generations": round(
+            statistics.mean(row["generations"] for row in per_question), 2
+        ),
+        "degraded": Counter(
+            row["degraded_reason"] for row in per_question if row["degraded_reason"]
+        ),
+        "nodes_ms": {
+            name: {
+                "count": len(samples),
+                "p50": round(percentile(samples, 0.5), 2),
+                "p95": round(percentile(samples, 0.95), 2),
+            }
+            for name, samples in sorted(node_ms.items())
+        },
+        "per_question": per_question,
+    }
+
+
+def report(result: Dict[str, Any]) -> None:
+    e2e = result["end_to_end_ms"]
+    print(
+        f"{result['questions']} questions: p50 {e2e['p50']:.0f}ms "
+        f"p95 {e2e['p95']:.0f}ms mean {e2e['mean']:.0f}ms"
+    )
+    print(
+        f"LLM calls/question {result['llm_calls_per_question']:.2f} "
+        f"{result['llm_calls_by_role']}; rewrites {result['mean_rewrites']:.2f}, "
+        f"generations {result['mean_generations']:.2f}, "
+        f"degraded {dict(result['degraded'])}"
+    )
+    print(f"{'node':<44} {'count':>5} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stats in result["nodes_ms"].items():
+        print(f"{name:<44} {stats['count']:>5} {stats['p50']:>9.1f} {stats['p95']:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--llm-latency-ms", type=float, default=100.0)
+    parser.add_argument("--search-latency-ms", type=float, default=300.0)
+    parser.add_argument("--retrieval", default="yes,no")
+    parser.add_argument("--hallucination", default="yes")
+    parser.add_argument("--answer", default="yes")
+    parser.add_argument(
+        "--generation-grading",
+        choices=["sequential", "concurrent", "combined"],
+        default="sequential",
+    )
+    parser.add_argument("--grader-concurrency", type=int, default=4)
+    parser.add_argument("--max-rewrites", type=int, default=2)
+    parser.add_argument("--max-regenerations", type=int, default=2)
+    parser.add_argument("--deadline", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        report(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Compare per-worker startup cost of the old and the shared retriever setup.
+
+The old wiring opened the Chroma store once from the app startup hook and
+once more from ``services.rag``, each through ``initialize_vectorstore()``;
+the registry opens it once and hands the same retriever to both. Each
+scenario runs the real ``aptify_api`` code in a fresh interpreter, makes the
+two retriever requests a worker makes at startup, runs one query and reports
+wall-clock time and peak RSS.
+
+Dense retrieval is used in both scenarios so the registry side does not also
+pay for building the BM25 index.
+
+Run from ``api/`` against an existing store::
+
+    uv run python benchmarks/registry_benchmark.py --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+
+SCENARIO = """
+import json, resource, sys, time
+started = time.perf_counter()
+{setup}
+retrievers[-1].invoke("Who pays stamp duty on a tenancy agreement?")
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+SCENARIOS = {
+    # startup hook + services.rag, each opening its own Chroma client
+    "before: initialize_vectorstore() x2": (
+        "from aptify_api.utils.init_vector_db import initialize_vectorstore\n"
+        "retrievers = [initialize_vectorstore(sync=False) for _ in range(2)]"
+    ),
+    "registry: RESOURCES.retriever x2": (
+        "from aptify_api.utils.registry import RESOURCES\n"
+        "retrievers = [RESOURCES.retriever for _ in range(2)]"
+    ),
+}
+
+
+def run(setup: str, env: dict) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", SCENARIO.format(setup=setup)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--store", default=os.getenv("CHROMA_PATH", "src/aptify_api/db/chroma")
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "CHROMA_PATH": os.path.abspath(args.store),
+        "CHROMA_SYNC": "0",
+        "RETRIEVAL_MODE": "dense",
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(SRC_PATH), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    print(f"{'scenario':<36} {'seconds':>8} {'peak RSS MB':>12}")
+    for label, setup in SCENARIOS.items():
+        samples = [run(setup, env) for _ in range(args.repeat)]
+        seconds = statistics.median(sample["seconds"] for sample in samples)
+        rss = statistics.median(sample["max_rss_mb"] for sample in samples)
+        print(f"{label:<36} {seconds:>8.2f} {rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
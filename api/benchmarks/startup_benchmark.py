@@ -0,0 +1,157 @@
+"""Measure worker cold start against a synthetic PDF corpus.
+
+Generates a few hundred small text PDFs, points ``DOCS_PATH`` at them and
+times, in fresh interpreters:
+
+* importing ``aptify_api.utils.init_vector_db`` with an existing Chroma
+  directory (the normal worker start path), and
+* parsing and splitting the whole corpus (``split_documents(load_documents())``),
+  which is the work that used to run on import.
+
+Run from ``api/``::
+
+    uv run python benchmarks/startup_benchmark.py --pdfs 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_PATH = Path(__file__).resolve().parents[1] / "src"
+
+LOREM = (
+    "The tenant must pay the rental bond to the lessor or agent. "
+    "The lessor must lodge the bond with the authority within ten days. "
+    "Entry to the premises requires a Form 9 entry notice. "
+)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: Path, pages: int, lines_per_page: int = 40) -> None:
+    """Write a minimal, valid text PDF without third-party dependencies."""
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = [
+            f"({_escape(f'p{page} l{line} ' + LOREM)}) Tj T*"
+            for line in range(lines_per_page)
+        ]
+        stream = "BT /F1 9 Tf 11 TL 36 800 Td " + " ".join(lines) + " ET"
+        objects.append(
+            f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode()
+        )
+        content_id = len(objects)
+        objects.append(
+            (
+                "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode()
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    body = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        body += f"{offset:010d} 00000 n \n".encode()
+    body += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    path.write_bytes(bytes(body))
+
+
+def build_corpus(directory: Path, pdfs: int, pages: int) -> None:
+    for index in range(pdfs):
+        write_pdf(directory / f"synthetic-{index:04d}.pdf", pages)
+
+
+def time_snippet(snippet: str, env: dict, repeat: int) -> list:
+    """Run ``snippet`` in fresh interpreters and return wall-clock seconds."""
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", snippet],
+            env=env,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def report(label: str, samples: list) -> None:
+    print(
+        f"{label:<38} median {statistics.median(samples):7.2f}s "
+        f"min {min(samples):7.2f}s max {max(samples):7.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdfs", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        corpus = Path(workdir) / "documents"
+        chroma = Path(workdir) / "chroma"
+        corpus.mkdir()
+        chroma.mkdir()
+        build_corpus(corpus, args.pdfs, args.pages)
+        print(f"Corpus: {args.pdfs} PDFs x {args.pages} pages in {corpus}")
+
+        env = {
+            **os.environ,
+            "DOCS_PATH": str(corpus),
+            "CHROMA_PATH": str(chroma),
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(SRC_PATH), os.environ.get("PYTHONPATH")])
+            ),
+        }
+        baseline = time_snippet("import langchain_huggingface", env, args.repeat)
+        startup = time_snippet(
+            "import aptify_api.utils.init_vector_db", env, args.repeat
+        )
+        parse = time_snippet(
+            "import aptify_api.utils.init_vector_db as db; db.split_documents(db.load_documents())",
+            env,
+            args.repeat,
+        )
+
+    report("interpreter + embedding libraries", baseline)
+    report("worker import (store exists)", startup)
+    report("worker import + corpus parse/split", parse)
+    print(
+        "Corpus parsing avoided at startup: "
+        f"{statistics.median(parse) - statistics.median(startup):.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Measure write and read throughput of each storage backend.
+
+For every backend, writes ``--records`` payment-shaped records one ``put``
+at a time, writes them again through ``put_many`` in ``--batch`` sized
+chunks (upserts), then reads ``--reads`` random ids with ``get`` and scans
+the whole collection with ``values``. The SQLite database lives in a
+temporary directory unless ``--sqlite-path`` is given.
+
+Run from ``api/``::
+
+    uv run python benchmarks/storage_benchmark.py --records 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from aptify_api.state import MemoryState  # noqa: E402
+from aptify_api.storage import MemoryBackend, SQLiteBackend, Storage  # noqa: E402
+
+STATUSES = ("scheduled", "received", "failed", "refunded")
+
+
+def records(count: int) -> Iterator[Dict[str, object]]:
+    for index in range(count):
+        yield {
+            "id": f"pay_{index:08x}",
+            "tenant_id": f"tenant_{index % 5000:05d}",
+            "due_date": f"2025-{index % 12 + 1:02d}-01",
+            "amount": 1200.0 + index % 700,
+            "method": "bank_transfer",
+            "autopay": index % 2 == 0,
+            "status": STATUSES[index % len(STATUSES)],
+            "created_at": "2025-01-01T00:00:00Z",
+            "updated_at": "2025-01-01T00:00:00Z",
+        }
+
+
+def chunks(items: Iterator[Dict[str, object]], size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def timed(label: str, operations: int, func) -> Dict[str, object]:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    return {"phase": label, "seconds": elapsed, "ops_per_s": operations / elapsed}
+
+
+def run_backend(name: str, storage: Storage, args: argparse.Namespace) -> list:
+    repository = storage.payments
+    rng = random.Random(7)
+    ids = [f"pay_{rng.randrange(args.records):08x}" for _ in range(args.reads)]
+
+    def put_each() -> None:
+        for record in records(args.records):
+            repository.put(record)
+        storage.flush()
+
+    def put_batched() -> None:
+        for chunk in chunks(records(args.records), args.batch):
+            repository.put_many(chunk)
+        storage.flush()
+
+    def get_random() -> None:
+        for record_id in ids:
+            assert repository.get(record_id) is not None
+
+    def scan() -> None:
+        assert sum(1 for _ in repository.values()) == args.records
+
+    rows = [
+        timed("put", args.records, put_each),
+        timed(f"put_many({args.batch})", args.records, put_batched),
+        timed("get", args.reads, get_random),
+        timed("scan", args.records, scan),
+    ]
+    for row in rows:
+        row["backend"] = name
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--reads", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--commit-batch", type=int, default=256)
+    parser.add_argument("--sqlite-path", default=None)
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "sqlite"], choices=["memory", "sqlite"]
+    )
+    args = parser.parse_args()
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            if backend == "memory":
+                storage = Storage(MemoryBackend(MemoryState()))
+            else:
+                path = args.sqlite_path or os.path.join(tmp, "bench.sqlite3")
+                storage = Storage(SQLiteBackend(path, commit_batch=args.commit_batch))
+            try:
+                rows.extend(run_backend(backend, storage, args))
+            finally:
+                storage.close()
+            if backend == "sqlite":
+                size = sum(
+                    os.path.getsize(os.path.join(os.path.dirname(path), entry))
+                    for entry in os.listdir(os.path.dirname(path))
+                    if entry.startswith(os.path.basename(path))
+                )
+                print(f"sqlite files: {size / 2**20:.0f} MiB")
+
+    print(f"{'backend':<8} {'phase':<15} {'seconds':>8} {'ops/s':>12}")
+    for row in rows:
+        print(
+            f"{row['backend']:<8} {row['phase']:<15} {row['seconds']:>8.2f} "
+            f"{row['ops_per_s']:>12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
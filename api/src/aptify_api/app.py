@@ -10,6 +10,7 @@ from .routers import (
     communications,
     documents,
     email,
+    exports,
     feedback,
     intake,
     knowledge,
@@ -21,7 +22,10 @@ from .routers import (
     vendors,
 )
 
-from aptify_api.utils.init_vector_db import initialize_vectorstore
+from .services.rag import close_dispatchers, rag_nodes
+from .storage import STORAGE
+from aptify_api.utils.llm_clients import LLM_CLIENTS
+from aptify_api.utils.registry import RESOURCES
 
 app = FastAPI(
     title="Aptify Property Management Platform",
@@ -44,8 +48,26 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def load_vector_db():
-    global retriever
-    retriever = initialize_vectorstore()
+    # Warm the shared registry; the RAG graph reuses the same retriever.
+    RESOURCES.retriever
+    # Index status is not persisted: re-queue articles left unindexed by the
+    # last run and drop chunks of articles that are no longer stored.
+    RESOURCES.article_indexer.reconcile(STORAGE.knowledge_articles.values())
+    # Load the chat models into Ollama so the first query runs at steady state.
+    await LLM_CLIENTS.warm_up()
+
+
+@app.on_event("shutdown")
+async def flush_article_index():
+    RESOURCES.close()
+    close_dispatchers()
+    rag_nodes.close()
+
+
+@app.on_event("shutdown")
+def close_storage():
+    # Commit writes still buffered by the SQLite backend.
+    STORAGE.close()
 
 
 app.include_router(email.router)
@@ -61,6 +83,7 @@ app.include_router(owners.router)
 app.include_router(documents.router)
 app.include_router(knowledge.router)
 app.include_router(analytics.router)
+app.include_router(exports.router)
 
 
 @app.get("/health")
@@ -4,6 +4,7 @@ from . import (
     communications,
     documents,
     email,
+    exports,
     feedback,
     intake,
     knowledge,
@@ -20,6 +21,7 @@ __all__ = [
     "communications",
     "documents",
     "email",
+    "exports",
     "feedback",
     "intake",
     "knowledge",
@@ -6,7 +6,7 @@ from typing import Dict, List
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
 
-from ..state import STATE
+from ..storage import STORAGE
 from ..utils import generate_id, timestamp
 
 
@@ -29,15 +29,12 @@ class ForecastRecord(BaseModel):
 
 @router.get("/kpis", response_model=Dict[str, float])
 def portfolio_kpis() -> Dict[str, float]:
-    active_leases = sum(1 for lease in STATE.leases.values() if lease["status"] == "active")
-    rent_collected = sum(
-        record["amount"]
-        for record in STATE.payments.values()
-        if record["status"] == "received"
-    )
-    maintenance_backlog = sum(
-        1 for order in STATE.maintenance_orders.values() if order["status"] != "completed"
-    )
+    leases = STORAGE.leases.totals.snapshot()
+    payments = STORAGE.payments.totals.snapshot()
+    orders = STORAGE.maintenance_orders.totals.snapshot()
+    active_leases = leases["counts"].get("active", 0)
+    rent_collected = payments["sums"].get("received", 0.0)
+    maintenance_backlog = orders["count"] - orders["counts"].get("completed", 0)
     return {
         "active_leases": float(active_leases),
         "rent_collected": rent_collected,
@@ -45,6 +42,30 @@ def portfolio_kpis() -> Dict[str, float]:
     }
 
 
+def _check_aggregates(repair: bool) -> Dict[str, object]:
+    drift = {
+        name: getattr(STORAGE, name).verify_totals(repair=repair)
+        for name in STORAGE.TOTALS
+    }
+    return {
+        "consistent": not any(drift.values()),
+        "repaired": repair and any(drift.values()),
+        "drift": drift,
+    }
+
+
+@router.get("/aggregates/verify", response_model=Dict[str, object])
+def verify_aggregates() -> Dict[str, object]:
+    """Recompute the running dashboard totals from the records and report drift."""
+    return _check_aggregates(repair=False)
+
+
+@router.post("/aggregates/repair", response_model=Dict[str, object])
+def repair_aggregates() -> Dict[str, object]:
+    """Report drift like ``verify`` and overwrite the drifted totals."""
+    return _check_aggregates(repair=True)
+
+
 @router.post("/forecasts", response_model=ForecastRecord)
 def create_forecast(payload: ForecastRequest) -> ForecastRecord:
     forecast_id = generate_id("forecast")
@@ -58,5 +79,5 @@ def create_forecast(payload: ForecastRequest) -> ForecastRecord:
         "projections": projections,
         "created_at": timestamp(),
     }
-    STATE.forecasts[forecast_id] = record
+    STORAGE.forecasts.put(record)
     return ForecastRecord(**record)
@@ -3,11 +3,19 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/communications", tags=["communications"])
@@ -47,7 +55,7 @@ def _estimate_sentiment(body: str) -> str:
 
 @router.post("", response_model=MessageRecord)
 def send_message(payload: MessagePayload) -> MessageRecord:
-    if payload.tenant_id not in STATE.tenants:
+    if payload.tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
     message_id = generate_id("msg")
     record = with_audit(
@@ -57,12 +65,19 @@ def send_message(payload: MessagePayload) -> MessageRecord:
             "sentiment": _estimate_sentiment(payload.body),
         }
     )
-    STATE.communications.setdefault(payload.tenant_id, []).append(record)
+    STORAGE.communications.append(payload.tenant_id, record)
     return MessageRecord(**record)
 
 
-@router.get("/{tenant_id}", response_model=List[Dict[str, object]])
-def timeline(tenant_id: str) -> List[Dict[str, object]]:
-    if tenant_id not in STATE.tenants:
+@router.get("/{tenant_id}", response_model=Page[Dict[str, object]])
+def timeline(
+    tenant_id: str,
+    channel: Optional[str] = None,
+    intent: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    if tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return STATE.communications.get(tenant_id, [])
+    return fetch_page(
+        STORAGE.communications, page, where(channel=channel, intent=intent), key=tenant_id
+    )
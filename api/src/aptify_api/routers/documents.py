@@ -4,11 +4,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/documents", tags=["documents"])
@@ -46,18 +55,23 @@ class ExtractionResult(BaseModel):
 def upload_document(payload: DocumentPayload) -> DocumentRecord:
     document_id = generate_id("doc")
     record = with_audit({"id": document_id, **payload.model_dump()})
-    STATE.documents[document_id] = record
+    STORAGE.documents.put(record)
     return DocumentRecord(**record)
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_documents() -> List[Dict[str, object]]:
-    return list(STATE.documents.values())
+@router.get("", response_model=Page[Dict[str, object]])
+def list_documents(
+    category: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.documents, page, where(category=category), sortable=SORTABLE + ("title",)
+    )
 
 
 @router.post("/{document_id}/extract", response_model=ExtractionResult)
 def extract_fields(document_id: str, payload: ExtractionRequest) -> ExtractionResult:
-    if document_id not in STATE.documents:
+    if document_id not in STORAGE.documents:
         raise HTTPException(status_code=404, detail="Document not found")
     fields = {
         key: f"Extracted {instruction}" for key, instruction in payload.schema.items()
@@ -69,10 +83,13 @@ def extract_fields(document_id: str, payload: ExtractionRequest) -> ExtractionRe
         "fields": fields,
         "created_at": timestamp(),
     }
-    STATE.document_extractions[extraction_id] = result
+    STORAGE.document_extractions.put(result)
     return ExtractionResult(**result)
 
 
-@router.get("/extractions", response_model=List[Dict[str, object]])
-def list_extractions() -> List[Dict[str, object]]:
-    return list(STATE.document_extractions.values())
+@router.get("/extractions", response_model=Page[Dict[str, object]])
+def list_extractions(
+    document_id: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(STORAGE.document_extractions, page, where(document_id=document_id))
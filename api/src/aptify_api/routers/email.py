@@ -4,11 +4,19 @@ from __future__ import annotations
 from collections import Counter
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/emails", tags=["email"])
@@ -122,7 +130,7 @@ def _suggest_actions(category: str, priority: str) -> List[str]:
 
 def _seed_mock_emails() -> None:
     """Warm the in-memory store with illustrative email records."""
-    if STATE.emails:
+    if STORAGE.emails:
         return
 
     for sample in MOCK_EMAILS:
@@ -144,7 +152,7 @@ def _seed_mock_emails() -> None:
                 "attachments": sample["attachments"],
             }
         )
-        STATE.emails[email_id] = record
+        STORAGE.emails.put(record)
 
 
 @router.post("/classify", response_model=ClassificationResult)
@@ -169,7 +177,7 @@ def classify_email(payload: EmailPayload) -> ClassificationResult:
             "attachments": payload.attachments,
         }
     )
-    STATE.emails[email_id] = record
+    STORAGE.emails.put(record)
     return ClassificationResult(
         email_id=email_id,
         category=category,
@@ -181,37 +189,48 @@ def classify_email(payload: EmailPayload) -> ClassificationResult:
     )
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_emails() -> List[Dict[str, object]]:
+@router.get("", response_model=Page[Dict[str, object]])
+def list_emails(
+    category: Optional[str] = None,
+    priority: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    property_id: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
     """Return stored email records for workspace queues."""
     _seed_mock_emails()
-    return list(STATE.emails.values())
+    criteria = where(
+        category=category, priority=priority, tenant_id=tenant_id, property_id=property_id
+    )
+    return fetch_page(STORAGE.emails, page, criteria)
 
 
 @router.get("/{email_id}", response_model=Dict[str, object])
 def get_email(email_id: str) -> Dict[str, object]:
-    if email_id not in STATE.emails:
+    record = STORAGE.emails.get(email_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Email not found")
-    return STATE.emails[email_id]
+    return record
 
 
 @router.post("/{email_id}/tags", response_model=Dict[str, object])
 def update_tags(email_id: str, request: TagUpdateRequest) -> Dict[str, object]:
     """Replace the tag collection for a stored email."""
-    if email_id not in STATE.emails:
+    existing = STORAGE.emails.get(email_id)
+    if existing is None:
         raise HTTPException(status_code=404, detail="Email not found")
-    record = STATE.emails[email_id].copy()
+    record = existing.copy()
     record["tags"] = sorted(set(request.tags))
     record["updated_at"] = timestamp()
-    STATE.emails[email_id] = record
+    STORAGE.emails.put(record)
     return record
 
 
 @router.post("/route", response_model=QueueRouteResponse)
 def route_email(request: QueueRouteRequest) -> QueueRouteResponse:
-    if request.email_id not in STATE.emails:
+    record = STORAGE.emails.get(request.email_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Email not found")
-    record = STATE.emails[request.email_id]
     priority = request.priority_override or record["priority"]
     queue_map = {
         "rent": "finance",
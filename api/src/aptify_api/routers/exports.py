@@ -0,0 +1,58 @@
+"""Streaming NDJSON bulk export of every stored collection."""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..storage import STORAGE, Storage
+from ..storage.export import gzip_chunks, ndjson_chunks, parse_timestamp
+
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+COLLECTIONS = Storage.REPOSITORIES + Storage.LOGS
+
+
+def _records(collection: str) -> Iterator[Dict[str, Any]]:
+    if collection not in Storage.LOG_KEYS:
+        return getattr(STORAGE, collection).values()
+    # Log records do not always carry their parent id; add it as a field.
+    field = Storage.LOG_KEYS[collection]
+    return (
+        {field: key, **record} for key, record in getattr(STORAGE, collection).items()
+    )
+
+
+@router.get("", response_model=List[str])
+def list_collections() -> List[str]:
+    return list(COLLECTIONS)
+
+
+@router.get("/{collection}", response_class=StreamingResponse)
+def export_collection(
+    collection: str,
+    since: Optional[str] = Query(
+        None,
+        description="Only records whose updated_at (or creation time) is at or after this ISO 8601 timestamp",
+    ),
+    gzip: bool = Query(False, description="Compress the stream (Content-Encoding: gzip)"),
+) -> StreamingResponse:
+    """Stream a whole collection as newline-delimited JSON, one record per line.
+
+    Records are read from storage and encoded a chunk at a time, so server
+    memory stays flat however large the collection is.
+    """
+    if collection not in COLLECTIONS:
+        raise HTTPException(status_code=404, detail="Collection not found")
+    try:
+        cutoff = parse_timestamp(since) if since is not None else None
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    chunks = ndjson_chunks(_records(collection), since=cutoff)
+    headers = {"Content-Disposition": f'attachment; filename="{collection}.ndjson"'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type="application/x-ndjson", headers=headers)
@@ -6,7 +6,7 @@ from typing import Dict, Optional
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
 
-from ..state import STATE
+from ..storage import STORAGE
 from ..utils import timestamp
 
 
@@ -36,14 +36,16 @@ def submit_feedback(payload: FeedbackPayload) -> FeedbackRecord:
         **payload.model_dump(),
         "submitted_at": timestamp(),
     }
-    STATE.email_feedback.append(record)
+    STORAGE.email_feedback.append(payload.item_id, record)
     return FeedbackRecord(**record)
 
 
 @router.get("", response_model=Dict[str, object])
 def feedback_summary() -> Dict[str, object]:
     breakdown: Dict[str, int] = {}
-    for record in STATE.email_feedback:
+    count = 0
+    for record in STORAGE.email_feedback.values():
         rating = record["rating"]
         breakdown[rating] = breakdown.get(rating, 0) + 1
-    return {"count": len(STATE.email_feedback), "sentiment": breakdown}
+        count += 1
+    return {"count": count, "sentiment": breakdown}
@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/intake", tags=["tenant intake"])
@@ -65,22 +74,34 @@ def capture_intake(payload: IntakePayload) -> IntakeRecord:
             "status": "pending_review",
         }
     )
-    STATE.intake_records[intake_id] = record
+    STORAGE.intake_records.put(record)
     return IntakeRecord(**record)
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_intake_records() -> List[Dict[str, object]]:
+@router.get("", response_model=Page[Dict[str, object]])
+def list_intake_records(
+    status: Optional[str] = None,
+    channel: Optional[str] = None,
+    urgency: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
     """List captured intake transcripts for compliance sampling."""
-    return list(STATE.intake_records.values())
+    return fetch_page(
+        STORAGE.intake_records,
+        page,
+        where(status=status, channel=channel, urgency=urgency, tenant_id=tenant_id),
+        sortable=SORTABLE + ("confidence",),
+    )
 
 
 @router.post("/{intake_id}/approve", response_model=Dict[str, object])
 def approve_intake(intake_id: str) -> Dict[str, object]:
-    if intake_id not in STATE.intake_records:
+    existing = STORAGE.intake_records.get(intake_id)
+    if existing is None:
         raise HTTPException(status_code=404, detail="Intake record not found")
-    record = STATE.intake_records[intake_id].copy()
+    record = existing.copy()
     record["status"] = "approved"
     record["updated_at"] = timestamp()
-    STATE.intake_records[intake_id] = record
+    STORAGE.intake_records.put(record)
     return record
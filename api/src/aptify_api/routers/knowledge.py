@@ -2,14 +2,33 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import GraphState, generate_id, timestamp
-from aptify_api.services.rag import app as rag_app
+from ..storage import STORAGE
+from ..utils import (
+    GraphState,
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+)
+from ..utils.registry import RESOURCES
+from ..utils.tracing import RAG_METRICS, RagTrace
+from aptify_api.services.rag import (
+    GRAPH_NODES,
+    answer_cache,
+    app as rag_app,
+    rag_nodes,
+)
 
 
 router = APIRouter(prefix="/knowledge", tags=["knowledge"])
@@ -28,17 +47,25 @@ class KnowledgeRecord(BaseModel):
     tags: List[str]
     created_at: str
     updated_at: str
+    # pending until the background indexer has embedded the article.
+    index_status: Optional[str] = None
 
 
 class KnowledgeQuery(BaseModel):
     question: str
     tags: List[str] = Field(default_factory=list)
+    # Return the per-node spans of this request alongside the answer.
+    trace: bool = False
 
 
 class KnowledgeAnswer(BaseModel):
     answer: str
     sources: List[Dict[str, str]]
     generated_at: str
+    cached: bool = False
+    degraded: bool = False
+    degraded_reason: Optional[str] = None
+    trace: Optional[Dict[str, Any]] = None
 
 
 @router.post("", response_model=KnowledgeRecord)
@@ -50,25 +77,50 @@ def add_article(payload: KnowledgeArticle) -> KnowledgeRecord:
         "created_at": timestamp(),
         "updated_at": timestamp(),
     }
-    STATE.knowledge_articles[article_id] = record
-    return KnowledgeRecord(**record)
+    STORAGE.knowledge_articles.put(record)
+    # Embedding happens on the indexer thread; the article becomes
+    # retrievable once its status turns to "indexed".
+    RESOURCES.article_indexer.submit(record)
+    return _article_record(record)
 
 
-@router.get("", response_model=List[KnowledgeRecord])
-def list_articles() -> List[KnowledgeRecord]:
-    return [KnowledgeRecord(**record) for record in STATE.knowledge_articles.values()]
+def _article_record(record: Dict[str, Any]) -> KnowledgeRecord:
+    return KnowledgeRecord(
+        **record, index_status=RESOURCES.article_indexer.status(record["id"])
+    )
 
 
-@router.post("/query", response_model=KnowledgeAnswer)
-def query_knowledge(payload: KnowledgeQuery) -> KnowledgeAnswer:
-    initial_state: GraphState = {
-        "question": payload.question,
-        "generation": "",
-        "documents": [],
+@router.get("", response_model=Page[KnowledgeRecord])
+def list_articles(page: PageQuery = Depends(page_query)) -> Page[KnowledgeRecord]:
+    result = fetch_page(STORAGE.knowledge_articles, page, sortable=SORTABLE + ("title",))
+    result.items = [_article_record(record) for record in result.items]
+    return result
+
+
+@router.put("/{article_id}", response_model=KnowledgeRecord)
+def update_article(article_id: str, payload: KnowledgeArticle) -> KnowledgeRecord:
+    existing = STORAGE.knowledge_articles.get(article_id)
+    if existing is None:
+        raise HTTPException(status_code=404, detail="Article not found")
+    record = {
+        **existing,
+        **payload.model_dump(),
+        "updated_at": timestamp(),
     }
-    final_state = rag_app.invoke(initial_state)
+    STORAGE.knowledge_articles.put(record)
+    RESOURCES.article_indexer.submit(record)
+    return _article_record(record)
 
-    answer = final_state.get("generation", "")
+
+@router.delete("/{article_id}", response_model=Dict[str, str])
+def delete_article(article_id: str) -> Dict[str, str]:
+    if not STORAGE.knowledge_articles.delete(article_id):
+        raise HTTPException(status_code=404, detail="Article not found")
+    RESOURCES.article_indexer.remove(article_id)
+    return {"id": article_id, "status": "deleted"}
+
+
+def _collect_sources(final_state: Dict[str, Any]) -> List[Dict[str, str]]:
     raw_documents = final_state.get("documents") or []
     if not isinstance(raw_documents, list):
         raw_documents = [raw_documents]
@@ -93,5 +145,140 @@ def query_knowledge(payload: KnowledgeQuery) -> KnowledgeAnswer:
         sources.append(
             {"source": source_label, "snippet": snippet[:1000]},
         )
+    return sources
+
+
+async def _cached_answer(question: str) -> Optional[KnowledgeAnswer]:
+    if answer_cache is None:
+        return None
+    # Embedding the question is CPU-bound, so keep it off the event loop.
+    cached = await run_in_threadpool(answer_cache.lookup, question)
+    if cached is None:
+        return None
+    return KnowledgeAnswer(
+        answer=cached.answer,
+        sources=cached.sources,
+        generated_at=cached.generated_at,
+        cached=True,
+    )
+
+
+async def _answer_from_state(
+    payload: KnowledgeQuery, final_state: Dict[str, Any], trace: RagTrace
+) -> KnowledgeAnswer:
+    question = payload.question
+    answer = final_state.get("generation", "")
+    sources = _collect_sources(final_state)
+    generated_at = timestamp()
+    degraded = bool(final_state.get("degraded"))
+    # Budget-limited answers are not worth replaying to later askers.
+    if answer_cache is not None and answer and not degraded:
+        await run_in_threadpool(
+            answer_cache.store, question, answer, sources, generated_at
+        )
+    return KnowledgeAnswer(
+        answer=answer,
+        sources=sources,
+        generated_at=generated_at,
+        degraded=degraded,
+        degraded_reason=final_state.get("degraded_reason"),
+        trace=trace.summary() if payload.trace else None,
+    )
+
+
+def _initial_state(payload: KnowledgeQuery) -> GraphState:
+    return rag_nodes.budget.initial_state(payload.question)
+
+
+def _finish_trace(trace: RagTrace) -> None:
+    trace.finish()
+    RAG_METRICS.record(trace)
+
+
+@router.post("/query", response_model=KnowledgeAnswer)
+async def query_knowledge(payload: KnowledgeQuery) -> KnowledgeAnswer:
+    cached = await _cached_answer(payload.question)
+    if cached is not None:
+        return cached
+
+    trace = RagTrace()
+    final_state = await rag_app.ainvoke(
+        _initial_state(payload), config={"callbacks": [trace]}
+    )
+    _finish_trace(trace)
+    return await _answer_from_state(payload, final_state, trace)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _token_text(chunk: Any) -> str:
+    # LLMs stream GenerationChunk (.text); chat models stream message chunks.
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return content
+    return getattr(chunk, "text", "") or ""
+
+
+async def _stream_answer(payload: KnowledgeQuery) -> AsyncIterator[str]:
+    cached = await _cached_answer(payload.question)
+    if cached is not None:
+        yield _sse("answer", cached.model_dump())
+        return
+
+    final_state: Dict[str, Any] = {}
+    trace = RagTrace()
+    try:
+        async for event in rag_app.astream_events(
+            _initial_state(payload), config={"callbacks": [trace]}, version="v2"
+        ):
+            kind = event["event"]
+            name = event.get("name")
+            if kind in ("on_chain_start", "on_chain_end") and name in GRAPH_NODES:
+                status = "started" if kind == "on_chain_start" else "completed"
+                yield _sse("node", {"node": name, "status": status})
+            elif kind in ("on_llm_stream", "on_chat_model_stream"):
+                if event.get("metadata", {}).get("langgraph_node") != "generate":
+                    continue
+                text = _token_text(event["data"].get("chunk"))
+                if text:
+                    yield _sse("token", {"text": text})
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                final_state = event["data"].get("output") or {}
+    except Exception as exc:  # surface failures to the client instead of hanging
+        yield _sse("error", {"detail": str(exc)})
+        return
+
+    _finish_trace(trace)
+    answer = await _answer_from_state(payload, final_state, trace)
+    yield _sse("answer", answer.model_dump())
+
+
+@router.post("/query/stream")
+async def stream_knowledge(payload: KnowledgeQuery) -> StreamingResponse:
+    """Stream node progress and generation tokens as server-sent events.
+
+    Emits ``node`` events as graph nodes start and finish, ``token`` events
+    while ``generate`` runs (a new ``generate`` start means the previous draft
+    was rejected), and a final ``answer`` event shaped like ``/query``.
+    """
+    return StreamingResponse(
+        _stream_answer(payload),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+def answer_cache_stats() -> Dict[str, Any]:
+    """Report hit/miss counters for the semantic answer cache."""
+    if answer_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **answer_cache.stats()}
+
 
-    return KnowledgeAnswer(answer=answer, sources=sources, generated_at=timestamp())
+@router.get("/metrics", response_model=Dict[str, Any])
+def rag_metrics() -> Dict[str, Any]:
+    """Latency histograms per graph node and for whole uncached queries."""
+    return RAG_METRICS.snapshot()
@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/leases", tags=["leasing"])
@@ -48,7 +57,7 @@ class LeaseTask(BaseModel):
 
 @router.post("", response_model=LeaseRecord)
 def create_lease(payload: LeasePayload) -> LeaseRecord:
-    if payload.tenant_id not in STATE.tenants:
+    if payload.tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
     lease_id = generate_id("lease")
     record = with_audit(
@@ -58,38 +67,56 @@ def create_lease(payload: LeasePayload) -> LeaseRecord:
             "status": "draft",
         }
     )
-    STATE.leases[lease_id] = record
-    STATE.lease_tasks[lease_id] = []
+    STORAGE.leases.put(record)
     return LeaseRecord(**record)
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_leases() -> List[Dict[str, object]]:
-    return list(STATE.leases.values())
+@router.get("", response_model=Page[Dict[str, object]])
+def list_leases(
+    tenant_id: Optional[str] = None,
+    property_id: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.leases,
+        page,
+        where(tenant_id=tenant_id, property_id=property_id, status=status),
+        sortable=SORTABLE + ("start_date", "end_date", "rent_amount"),
+    )
 
 
 @router.post("/{lease_id}/status", response_model=LeaseRecord)
 def update_status(lease_id: str, payload: LeaseStatusUpdate) -> LeaseRecord:
-    if lease_id not in STATE.leases:
+    record = STORAGE.leases.update(
+        lease_id, {"status": payload.status, "updated_at": timestamp()}
+    )
+    if record is None:
         raise HTTPException(status_code=404, detail="Lease not found")
-    record = STATE.leases[lease_id].copy()
-    record["status"] = payload.status
-    record["updated_at"] = timestamp()
-    STATE.leases[lease_id] = record
     return LeaseRecord(**record)
 
 
 @router.post("/{lease_id}/tasks", response_model=List[Dict[str, object]])
 def add_task(lease_id: str, payload: LeaseTask) -> List[Dict[str, object]]:
-    if lease_id not in STATE.leases:
+    if lease_id not in STORAGE.leases:
         raise HTTPException(status_code=404, detail="Lease not found")
     task = with_audit({"id": generate_id("task"), **payload.model_dump()})
-    STATE.lease_tasks.setdefault(lease_id, []).append(task)
-    return STATE.lease_tasks[lease_id]
+    STORAGE.lease_tasks.append(lease_id, task)
+    return STORAGE.lease_tasks.list(lease_id)
 
 
-@router.get("/{lease_id}/tasks", response_model=List[Dict[str, object]])
-def list_tasks(lease_id: str) -> List[Dict[str, object]]:
-    if lease_id not in STATE.leases:
+@router.get("/{lease_id}/tasks", response_model=Page[Dict[str, object]])
+def list_tasks(
+    lease_id: str,
+    assignee: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    if lease_id not in STORAGE.leases:
         raise HTTPException(status_code=404, detail="Lease not found")
-    return STATE.lease_tasks.get(lease_id, [])
+    return fetch_page(
+        STORAGE.lease_tasks,
+        page,
+        where(assignee=assignee),
+        sortable=SORTABLE + ("due_date",),
+        key=lease_id,
+    )
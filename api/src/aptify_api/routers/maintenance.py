@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/maintenance", tags=["maintenance"])
@@ -43,7 +52,7 @@ class WorkOrderUpdate(BaseModel):
 
 @router.post("/work-orders", response_model=WorkOrderRecord)
 def create_work_order(payload: WorkOrderPayload) -> WorkOrderRecord:
-    if payload.tenant_id not in STATE.tenants:
+    if payload.tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
     work_order_id = generate_id("wo")
     record = with_audit(
@@ -53,40 +62,60 @@ def create_work_order(payload: WorkOrderPayload) -> WorkOrderRecord:
             "status": "draft",
         }
     )
-    STATE.maintenance_orders[work_order_id] = record
-    STATE.maintenance_events[work_order_id] = []
+    STORAGE.maintenance_orders.put(record)
     return WorkOrderRecord(**record)
 
 
 @router.post("/work-orders/{work_order_id}", response_model=WorkOrderRecord)
 def update_work_order(work_order_id: str, payload: WorkOrderUpdate) -> WorkOrderRecord:
-    if work_order_id not in STATE.maintenance_orders:
+    record = STORAGE.maintenance_orders.update(
+        work_order_id,
+        {**payload.model_dump(exclude_unset=True), "updated_at": timestamp()},
+    )
+    if record is None:
         raise HTTPException(status_code=404, detail="Work order not found")
-    record = STATE.maintenance_orders[work_order_id].copy()
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        record[field] = value
-    record["updated_at"] = timestamp()
-    STATE.maintenance_orders[work_order_id] = record
     if payload.status:
         event = with_audit(
             {"type": "status_change", "status": payload.status, "id": generate_id("evt")}
         )
-        STATE.maintenance_events.setdefault(work_order_id, []).append(event)
+        STORAGE.maintenance_events.append(work_order_id, event)
     return WorkOrderRecord(**record)
 
 
-@router.get("/work-orders", response_model=List[Dict[str, object]])
-def list_work_orders() -> List[Dict[str, object]]:
-    return list(STATE.maintenance_orders.values())
+@router.get("/work-orders", response_model=Page[Dict[str, object]])
+def list_work_orders(
+    tenant_id: Optional[str] = None,
+    property_id: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    priority: Optional[str] = None,
+    vendor_id: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.maintenance_orders,
+        page,
+        where(
+            tenant_id=tenant_id,
+            property_id=property_id,
+            status=status,
+            priority=priority,
+            vendor_id=vendor_id,
+        ),
+        sortable=SORTABLE + ("target_date",),
+    )
 
 
 @router.get("/dashboard", response_model=Dict[str, object])
 def maintenance_dashboard() -> Dict[str, object]:
-    summary: Dict[str, int] = {"draft": 0, "scheduled": 0, "in_progress": 0, "completed": 0}
-    for order in STATE.maintenance_orders.values():
-        status = order["status"]
-        summary[status] = summary.get(status, 0) + 1
+    snapshot = STORAGE.maintenance_orders.totals.snapshot()
+    summary: Dict[str, int] = {
+        "draft": 0,
+        "scheduled": 0,
+        "in_progress": 0,
+        "completed": 0,
+        **snapshot["counts"],
+    }
     return {
         "summary": summary,
-        "total": len(STATE.maintenance_orders),
+        "total": snapshot["count"],
     }
@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/owners", tags=["owners"])
@@ -41,18 +50,18 @@ class OwnerReportPayload(BaseModel):
 def create_owner(payload: OwnerPayload) -> OwnerRecord:
     owner_id = generate_id("owner")
     record = with_audit({"id": owner_id, **payload.model_dump()})
-    STATE.owners[owner_id] = record
+    STORAGE.owners.put(record)
     return OwnerRecord(**record)
 
 
-@router.get("", response_model=List[OwnerRecord])
-def list_owners() -> List[OwnerRecord]:
-    return [OwnerRecord(**record) for record in STATE.owners.values()]
+@router.get("", response_model=Page[OwnerRecord])
+def list_owners(page: PageQuery = Depends(page_query)) -> Page[OwnerRecord]:
+    return fetch_page(STORAGE.owners, page, sortable=SORTABLE + ("name",))
 
 
 @router.post("/reports", response_model=Dict[str, object])
 def generate_report(payload: OwnerReportPayload) -> Dict[str, object]:
-    if payload.owner_id not in STATE.owners:
+    if payload.owner_id not in STORAGE.owners:
         raise HTTPException(status_code=404, detail="Owner not found")
     report_id = generate_id("report")
     net_income = payload.income - payload.expenses
@@ -64,10 +73,19 @@ def generate_report(payload: OwnerReportPayload) -> Dict[str, object]:
             "status": "delivered",
         }
     )
-    STATE.owner_reports[report_id] = report
+    STORAGE.owner_reports.put(report)
     return report
 
 
-@router.get("/reports", response_model=List[Dict[str, object]])
-def list_reports() -> List[Dict[str, object]]:
-    return list(STATE.owner_reports.values())
+@router.get("/reports", response_model=Page[Dict[str, object]])
+def list_reports(
+    owner_id: Optional[str] = None,
+    period: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.owner_reports,
+        page,
+        where(owner_id=owner_id, period=period),
+        sortable=SORTABLE + ("period",),
+    )
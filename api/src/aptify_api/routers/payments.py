@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/payments", tags=["payments"])
@@ -40,7 +49,7 @@ class PaymentUpdate(BaseModel):
 
 @router.post("/schedule", response_model=PaymentRecord)
 def schedule_payment(payload: PaymentSchedule) -> PaymentRecord:
-    if payload.tenant_id not in STATE.tenants:
+    if payload.tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
     payment_id = generate_id("pay")
     record = with_audit(
@@ -50,37 +59,46 @@ def schedule_payment(payload: PaymentSchedule) -> PaymentRecord:
             "status": "scheduled",
         }
     )
-    STATE.payments[payment_id] = record
+    STORAGE.payments.put(record)
     return PaymentRecord(**record)
 
 
 @router.post("/{payment_id}/status", response_model=PaymentRecord)
 def update_payment(payment_id: str, payload: PaymentUpdate) -> PaymentRecord:
-    if payment_id not in STATE.payments:
+    record = STORAGE.payments.update(
+        payment_id, {**payload.model_dump(exclude_unset=True), "updated_at": timestamp()}
+    )
+    if record is None:
         raise HTTPException(status_code=404, detail="Payment not found")
-    record = STATE.payments[payment_id].copy()
-    record.update(payload.model_dump(exclude_unset=True))
-    record["updated_at"] = timestamp()
-    STATE.payments[payment_id] = record
     return PaymentRecord(**record)
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_payments() -> List[Dict[str, object]]:
-    return list(STATE.payments.values())
+@router.get("", response_model=Page[Dict[str, object]])
+def list_payments(
+    tenant_id: Optional[str] = None,
+    status: Optional[List[str]] = Query(None),
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.payments,
+        page,
+        where(tenant_id=tenant_id, status=status),
+        sortable=SORTABLE + ("due_date", "amount"),
+    )
 
 
 @router.get("/summary", response_model=Dict[str, object])
 def payment_summary() -> Dict[str, object]:
+    # Running totals kept by the repository; no scan of the payments.
+    snapshot = STORAGE.payments.totals.snapshot()
     totals = {
         "scheduled": 0.0,
         "received": 0.0,
         "failed": 0.0,
         "refunded": 0.0,
+        **snapshot["sums"],
     }
-    for record in STATE.payments.values():
-        totals[record["status"]] += record["amount"]
     return {
         "totals": totals,
-        "count": len(STATE.payments),
+        "count": snapshot["count"],
     }
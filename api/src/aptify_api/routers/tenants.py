@@ -1,13 +1,22 @@
 """Tenant lifecycle management endpoints."""
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/tenants", tags=["tenants"])
@@ -46,37 +55,47 @@ class TenantUpdate(BaseModel):
 def create_tenant(payload: TenantPayload) -> TenantRecord:
     tenant_id = generate_id("tenant")
     record = with_audit({**payload.model_dump(), "id": tenant_id})
-    STATE.tenants[tenant_id] = record
-    STATE.communications.setdefault(tenant_id, [])
+    STORAGE.tenants.put(record)
     return TenantRecord(**record)
 
 
-@router.get("", response_model=List[TenantRecord])
-def list_tenants() -> List[TenantRecord]:
-    return [TenantRecord(**tenant) for tenant in STATE.tenants.values()]
+@router.get("", response_model=Page[TenantRecord])
+def list_tenants(
+    stage: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[TenantRecord]:
+    return fetch_page(
+        STORAGE.tenants, page, where(stage=stage), sortable=SORTABLE + ("name",)
+    )
 
 
 @router.get("/{tenant_id}", response_model=TenantRecord)
 def get_tenant(tenant_id: str) -> TenantRecord:
-    if tenant_id not in STATE.tenants:
+    record = STORAGE.tenants.get(tenant_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return TenantRecord(**STATE.tenants[tenant_id])
+    return TenantRecord(**record)
 
 
 @router.patch("/{tenant_id}", response_model=TenantRecord)
 def update_tenant(tenant_id: str, payload: TenantUpdate) -> TenantRecord:
-    if tenant_id not in STATE.tenants:
+    existing = STORAGE.tenants.get(tenant_id)
+    if existing is None:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    record = STATE.tenants[tenant_id].copy()
+    record = existing.copy()
     for field, value in payload.model_dump(exclude_unset=True).items():
         record[field] = value
     record["updated_at"] = timestamp()
-    STATE.tenants[tenant_id] = record
+    STORAGE.tenants.put(record)
     return TenantRecord(**record)
 
 
-@router.get("/{tenant_id}/communications", response_model=List[Dict[str, object]])
-def tenant_communications(tenant_id: str) -> List[Dict[str, object]]:
-    if tenant_id not in STATE.tenants:
+@router.get("/{tenant_id}/communications", response_model=Page[Dict[str, object]])
+def tenant_communications(
+    tenant_id: str,
+    channel: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    if tenant_id not in STORAGE.tenants:
         raise HTTPException(status_code=404, detail="Tenant not found")
-    return STATE.communications.get(tenant_id, [])
+    return fetch_page(STORAGE.communications, page, where(channel=channel), key=tenant_id)
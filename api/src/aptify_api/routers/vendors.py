@@ -3,11 +3,20 @@ from __future__ import annotations
 
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
-from ..state import STATE
-from ..utils import generate_id, timestamp, with_audit
+from ..storage import STORAGE, where
+from ..utils import (
+    Page,
+    PageQuery,
+    SORTABLE,
+    fetch_page,
+    generate_id,
+    page_query,
+    timestamp,
+    with_audit,
+)
 
 
 router = APIRouter(prefix="/vendors", tags=["vendors"])
@@ -48,25 +57,34 @@ def register_vendor(payload: VendorPayload) -> VendorRecord:
             "rating": 4.5,
         }
     )
-    STATE.vendors[vendor_id] = record
-    STATE.vendor_reviews[vendor_id] = []
+    STORAGE.vendors.put(record)
     return VendorRecord(**record)
 
 
-@router.get("", response_model=List[Dict[str, object]])
-def list_vendors() -> List[Dict[str, object]]:
-    return list(STATE.vendors.values())
+@router.get("", response_model=Page[Dict[str, object]])
+def list_vendors(
+    status: Optional[str] = None,
+    service_type: Optional[str] = None,
+    page: PageQuery = Depends(page_query),
+) -> Page[Dict[str, object]]:
+    return fetch_page(
+        STORAGE.vendors,
+        page,
+        where(status=status, service_type=service_type),
+        sortable=SORTABLE + ("name", "rating"),
+    )
 
 
 @router.post("/{vendor_id}/reviews", response_model=Dict[str, object])
 def add_review(vendor_id: str, payload: VendorReview) -> Dict[str, object]:
-    if vendor_id not in STATE.vendors:
+    existing = STORAGE.vendors.get(vendor_id)
+    if existing is None:
         raise HTTPException(status_code=404, detail="Vendor not found")
     review = with_audit({"id": generate_id("review"), **payload.model_dump()})
-    STATE.vendor_reviews.setdefault(vendor_id, []).append(review)
-    ratings = [entry["score"] for entry in STATE.vendor_reviews[vendor_id]]
-    record = STATE.vendors[vendor_id].copy()
+    STORAGE.vendor_reviews.append(vendor_id, review)
+    ratings = [entry["score"] for entry in STORAGE.vendor_reviews.list(vendor_id)]
+    record = existing.copy()
     record["rating"] = sum(ratings) / len(ratings)
     record["updated_at"] = timestamp()
-    STATE.vendors[vendor_id] = record
+    STORAGE.vendors.put(record)
     return record
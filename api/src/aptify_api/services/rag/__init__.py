@@ -1,24 +1,25 @@
 import os
-from langgraph.graph import END, StateGraph, START
-from langchain_ollama import OllamaLLM, ChatOllama
 from langchain_tavily import TavilySearch
 from dotenv import load_dotenv
 
 from aptify_api.services.rag.chains import (
     build_answer_grader,
+    build_generation_grader,
     build_hallucination_grader,
     build_question_rewriter,
     build_question_router,
     build_rag_chain,
     build_retrieval_grader,
 )
-from aptify_api.utils.init_vector_db import initialize_vectorstore
-from aptify_api.utils.rag import GraphState, RagGraphNodes
-
-# from aptify_api.app import retriever
-retriever = initialize_vectorstore()
-
-# from utils.init_vector_db import initialize_vectorstore
+from aptify_api.services.rag.graph import build_workflow
+from aptify_api.utils.answer_cache import SemanticAnswerCache
+from aptify_api.utils.init_vector_db import vectorstore_version
+from aptify_api.utils.llm_clients import LLM_CLIENTS
+from aptify_api.utils.llm_dispatch import LLMDispatcher
+from aptify_api.utils.rag import RagBudget, RagGraphNodes
+from aptify_api.utils.registry import RESOURCES
+from aptify_api.utils.reranker import CrossEncoderReranker
+from aptify_api.utils.web_search import CachedWebSearch, TavilyWebSearch
 
 load_dotenv()
 # from langchain_openai import ChatOpenAI
@@ -26,25 +27,56 @@ load_dotenv()
 ### Router
 # local_llm = 'mistral'
 # LLM
+# Make sure to run `ollama pull <model>` first. The graders use CHECKER_MODEL
+# when set; with one model, all six chains share a single pooled client.
 model_name = os.getenv("MODEL", "llama3.1")
-llm = OllamaLLM(model=model_name, temperature=0)
-llm_checker = ChatOllama(
-    model="llama3.1", temperature=0  # Make sure to run `ollama pull llama3.1` first
-)
+llm = LLM_CLIENTS.get(model_name)
+llm_checker = LLM_CLIENTS.get(os.getenv("CHECKER_MODEL", model_name))
 # llm_checker = ChatOpenAI(model="gpt-4o-mini")
 
-question_router = build_question_router(llm)
-retrieval_grader = build_retrieval_grader(llm_checker)
+# LLM_DISPATCH=1 sends router, grader and rewriter calls from all requests
+# through one micro-batching dispatcher per client; generation stays direct
+# so its tokens can stream.
+dispatchers = {}
+if os.getenv("LLM_DISPATCH", "0") == "1":
+    dispatchers["llm"] = LLMDispatcher.from_env(llm)
+    dispatchers["checker"] = (
+        dispatchers["llm"] if llm_checker is llm else LLMDispatcher.from_env(llm_checker)
+    )
+
+
+def close_dispatchers() -> None:
+    """Stop the dispatcher workers; the graders share one with one model."""
+
+    for dispatcher in set(dispatchers.values()):
+        dispatcher.close()
+
+
+def _client(client: str, route: str):
+    base = llm if client == "llm" else llm_checker
+    return dispatchers[client].route(route) if dispatchers else base
+
+
+question_router = build_question_router(_client("llm", "question_router"))
+retrieval_grader = build_retrieval_grader(_client("checker", "retrieval_grader"))
 rag_chain = build_rag_chain(llm)
-hallucination_grader = build_hallucination_grader(llm_checker)
-answer_grader = build_answer_grader(llm_checker)
-question_rewriter = build_question_rewriter(llm_checker)
+hallucination_grader = build_hallucination_grader(
+    _client("checker", "hallucination_grader")
+)
+answer_grader = build_answer_grader(_client("checker", "answer_grader"))
+generation_grader = build_generation_grader(_client("checker", "generation_grader"))
+question_rewriter = build_question_rewriter(_client("checker", "question_rewriter"))
 
 ### Search
-web_search_tool = TavilySearch(k=3)
+web_search_tool = CachedWebSearch(
+    TavilyWebSearch(TavilySearch(k=3)),
+    ttl_seconds=float(os.getenv("WEB_SEARCH_CACHE_TTL", "900")),
+    max_entries=int(os.getenv("WEB_SEARCH_CACHE_SIZE", "256")),
+)
 
 rag_nodes = RagGraphNodes(
-    retriever=retriever,
+    # Shared with the rest of the process; opened on first use.
+    retriever=lambda: RESOURCES.retriever,
     rag_chain=rag_chain,
     question_router=question_router,
     question_rewriter=question_rewriter,
@@ -52,55 +84,44 @@ rag_nodes = RagGraphNodes(
     web_search_tool=web_search_tool,
     hallucination_grader=hallucination_grader,
     answer_grader=answer_grader,
+    grading_concurrency=int(os.getenv("GRADER_CONCURRENCY", "4")),
+    budget=RagBudget.from_env(),
+    web_context_tokens=int(os.getenv("WEB_CONTEXT_TOKENS", "1500")),
+    context_tokens=int(os.getenv("RAG_CONTEXT_TOKENS", "3000")),
+    # GENERATION_GRADING=concurrent|combined saves a round trip per answer.
+    generation_grader=generation_grader,
+    generation_grading=os.getenv("GENERATION_GRADING", "sequential"),
+    # RELEVANCE_GRADER=cross_encoder swaps the LLM grader for a local reranker.
+    reranker=(
+        CrossEncoderReranker.from_env()
+        if os.getenv("RELEVANCE_GRADER", "llm") == "cross_encoder"
+        else None
+    ),
 )
 
 
-workflow = StateGraph(GraphState)
-
-# Define the nodes via the reusable handlers
-workflow.add_node("web_search", rag_nodes.web_search)
-workflow.add_node("retrieve", rag_nodes.retrieve)
-workflow.add_node("grade_documents", rag_nodes.grade_documents)
-workflow.add_node("generate", rag_nodes.generate)
-workflow.add_node("transform_query", rag_nodes.transform_query)
-
-# Build graph
-workflow.add_conditional_edges(
-    START,
-    rag_nodes.route_question,
-    {
-        "web_search": "web_search",
-        "vectorstore": "retrieve",
-    },
-)
-workflow.add_edge("web_search", "generate")
-workflow.add_edge("retrieve", "grade_documents")
-workflow.add_conditional_edges(
-    "grade_documents",
-    rag_nodes.decide_to_generate,
-    {
-        "transform_query": "transform_query",
-        "generate": "generate",
-    },
-)
-workflow.add_edge("transform_query", "retrieve")
-workflow.add_conditional_edges(
-    "generate",
-    rag_nodes.grade_generation_v_documents_and_question,
-    {
-        "not supported": "generate",
-        "useful": END,
-        "not useful": "transform_query",
-    },
-)
+workflow = build_workflow(rag_nodes)
 
 # Compile
 app = workflow.compile()
+GRAPH_NODES = frozenset(workflow.nodes)
+
+### Answer cache
+answer_cache = (
+    SemanticAnswerCache(
+        embedding=lambda: RESOURCES.embeddings,
+        threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+        ttl_seconds=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+        max_entries=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+        version=vectorstore_version,
+    )
+    if os.getenv("ANSWER_CACHE_ENABLED", "1") == "1"
+    else None
+)
 if __name__ == "__main__":
-    initial_state: GraphState = {
-        "question": "Who pays stamp duty on tenancy agreement?",
-        "generation": "",
-    }
+    initial_state = rag_nodes.budget.initial_state(
+        "Who pays stamp duty on tenancy agreement?"
+    )
     final_state = app.invoke(initial_state)
     print("Final generation:")
     print(final_state)
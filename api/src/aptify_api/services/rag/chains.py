@@ -4,6 +4,7 @@ from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 
 from aptify_api.services.rag.prompts import (
     answer_prompt,
+    generation_grade_prompt,
     generation_prompt,
     hallucination_prompt,
     question_rewriter_prompt,
@@ -42,6 +43,12 @@ def build_answer_grader(llm_checker):
     return answer_prompt | llm_checker | JsonOutputParser()
 
 
+def build_generation_grader(llm_checker):
+    """Grade grounding and usefulness of a generation in a single call."""
+
+    return generation_grade_prompt | llm_checker | JsonOutputParser()
+
+
 def build_question_rewriter(llm_checker):
     """Produce an improved question optimised for retrieval."""
 
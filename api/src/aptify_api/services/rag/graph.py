@@ -0,0 +1,80 @@
+"""Corrective-RAG graph wiring for the workflow nodes."""
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, StateGraph
+
+from aptify_api.utils.rag import GraphState, RagGraphNodes
+
+
+def _node(rag_nodes: RagGraphNodes, name: str) -> RunnableLambda:
+    """Pair a sync node handler with its coroutine twin (``a<name>``)."""
+
+    return RunnableLambda(
+        getattr(rag_nodes, name),
+        afunc=getattr(rag_nodes, f"a{name}"),
+        name=f"rag_nodes.{name}",
+    )
+
+
+def build_workflow(rag_nodes: RagGraphNodes) -> StateGraph:
+    """Wire the nodes into the route / grade / rewrite / regenerate graph."""
+
+    workflow = StateGraph(GraphState)
+
+    # Define the nodes via the reusable handlers
+    workflow.add_node("web_search", _node(rag_nodes, "web_search"))
+    workflow.add_node("retrieve", _node(rag_nodes, "retrieve"))
+    workflow.add_node("grade_documents", _node(rag_nodes, "grade_documents"))
+    workflow.add_node("generate", _node(rag_nodes, "generate"))
+    workflow.add_node("transform_query", _node(rag_nodes, "transform_query"))
+    workflow.add_node(
+        "reject_generation",
+        RunnableLambda(rag_nodes.reject_generation, name="rag_nodes.reject_generation"),
+    )
+    workflow.add_node(
+        "degrade", RunnableLambda(rag_nodes.degrade, name="rag_nodes.degrade")
+    )
+
+    # Build graph
+    workflow.add_conditional_edges(
+        START,
+        _node(rag_nodes, "route_question"),
+        {
+            "web_search": "web_search",
+            "vectorstore": "retrieve",
+        },
+    )
+    workflow.add_edge("web_search", "generate")
+    workflow.add_edge("retrieve", "grade_documents")
+    # Budget checks reach "degrade" through a Send that carries the reason;
+    # the "degrade" entries below keep those edges in the drawn graph.
+    workflow.add_conditional_edges(
+        "grade_documents",
+        rag_nodes.decide_to_generate,
+        {
+            "transform_query": "transform_query",
+            "generate": "generate",
+            "degrade": "degrade",
+        },
+    )
+    workflow.add_edge("transform_query", "retrieve")
+    workflow.add_conditional_edges(
+        "generate",
+        _node(rag_nodes, "grade_generation_v_documents_and_question"),
+        {
+            "not supported": "reject_generation",
+            "useful": END,
+            "not useful": "transform_query",
+            "degrade": "degrade",
+        },
+    )
+    workflow.add_conditional_edges(
+        "reject_generation",
+        rag_nodes.decide_to_regenerate,
+        {
+            "generate": "generate",
+            "degrade": "degrade",
+        },
+    )
+    workflow.add_edge("degrade", END)
+    return workflow
@@ -63,6 +63,20 @@ answer_prompt = PromptTemplate(
     input_variables=["generation", "question"],
 )
 
+generation_grade_prompt = PromptTemplate(
+    template="""You are a grader assessing an answer to a user question against a set of facts. \n 
+    Here are the facts:
+    \n ------- \n
+    {documents} 
+    \n ------- \n
+    Here is the question: {question}
+    Here is the answer: {generation}
+    Give a binary score 'yes' or 'no' for whether the answer is grounded in / supported by the facts, \n
+    and a binary score 'yes' or 'no' for whether the answer is useful to resolve the question. \n
+    Provide the scores as a JSON with the keys 'grounded' and 'useful' and no preamble or explanation.""",
+    input_variables=["documents", "question", "generation"],
+)
+
 question_rewriter_prompt = PromptTemplate(
     template="""You a question re-writer that converts an input question to a better version that is optimized \n 
      for vectorstore retrieval. Look at the initial and formulate an improved question. \n
@@ -10,7 +10,7 @@ class MemoryState:
     """Container object storing all mock domain records."""
 
     emails: Dict[str, dict] = field(default_factory=dict)
-    email_feedback: List[dict] = field(default_factory=list)
+    email_feedback: Dict[str, List[dict]] = field(default_factory=dict)
     tenants: Dict[str, dict] = field(default_factory=dict)
     intake_records: Dict[str, dict] = field(default_factory=dict)
     communications: Dict[str, List[dict]] = field(default_factory=dict)
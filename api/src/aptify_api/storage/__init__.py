@@ -0,0 +1,47 @@
+"""Pluggable storage for the domain records served by the routers."""
+
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from .base import Record, RecordLog, Repository, Storage, StorageBackend, where
+from .memory import MemoryBackend
+from .pagination import Page
+from .sqlite import SQLiteBackend
+
+STORAGE_BACKENDS = ("memory", "sqlite")
+
+
+def open_storage(backend: Optional[str] = None) -> Storage:
+    """Open the backend named by ``backend`` or ``STORAGE_BACKEND`` (default memory)."""
+
+    backend = backend or os.getenv("STORAGE_BACKEND", "memory")
+    if backend == "memory":
+        return Storage(MemoryBackend())
+    if backend == "sqlite":
+        return Storage(SQLiteBackend.from_env())
+    raise ValueError(
+        f"Unknown storage backend {backend!r}; expected one of {STORAGE_BACKENDS}"
+    )
+
+
+load_dotenv()
+STORAGE = open_storage()
+
+__all__ = [
+    "Record",
+    "RecordLog",
+    "Repository",
+    "Storage",
+    "StorageBackend",
+    "MemoryBackend",
+    "Page",
+    "SQLiteBackend",
+    "STORAGE",
+    "STORAGE_BACKENDS",
+    "open_storage",
+    "where",
+]
@@ -0,0 +1,95 @@
+"""Running totals kept in step with repository writes."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Record = Dict[str, Any]
+
+
+class GroupTotals:
+    """Record count, and optionally an amount sum, per value of one field.
+
+    Repositories call ``replace(old, new)`` with every write, so reading the
+    totals is O(number of distinct values) instead of a collection scan.
+    ``drift`` compares against totals recomputed from the records.
+    """
+
+    def __init__(self, field: str, amount: Optional[str] = None) -> None:
+        self.field = field
+        self.amount = amount
+        self._lock = threading.Lock()
+        self.count = 0
+        self.counts: Dict[Any, int] = {}
+        self.sums: Dict[Any, float] = {}
+
+    def _key(self, record: Record) -> Any:
+        value = record.get(self.field)
+        return value if isinstance(value, Hashable) else str(value)
+
+    def _apply(self, record: Record, sign: int) -> None:
+        key = self._key(record)
+        self.count += sign
+        count = self.counts.get(key, 0) + sign
+        if count:
+            self.counts[key] = count
+        else:
+            # Dropping empty groups also drops their float rounding residue.
+            self.counts.pop(key, None)
+            self.sums.pop(key, None)
+            return
+        if self.amount is not None:
+            amount = float(record.get(self.amount) or 0.0)
+            self.sums[key] = self.sums.get(key, 0.0) + sign * amount
+
+    def replace(self, old: Optional[Record], new: Optional[Record]) -> None:
+        with self._lock:
+            if old is not None:
+                self._apply(old, -1)
+            if new is not None:
+                self._apply(new, 1)
+
+    def reset(self, records: Iterable[Record]) -> None:
+        with self._lock:
+            self.count = 0
+            self.counts = {}
+            self.sums = {}
+            for record in records:
+                self._apply(record, 1)
+
+    def load(self, rows: Iterable[Tuple[Any, int, float]]) -> None:
+        """Replace the totals with precomputed ``(value, count, sum)`` rows."""
+
+        with self._lock:
+            self.counts = {}
+            self.sums = {}
+            for key, count, total in rows:
+                self.counts[key] = count
+                if self.amount is not None:
+                    self.sums[key] = float(total or 0.0)
+            self.count = sum(self.counts.values())
+
+    def empty(self) -> "GroupTotals":
+        return GroupTotals(self.field, self.amount)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"count": self.count, "counts": dict(self.counts), "sums": dict(self.sums)}
+
+    def drift(self, expected: "GroupTotals", tolerance: float = 1e-6) -> List[Dict[str, Any]]:
+        """Differences from ``expected``; empty when the running totals are right."""
+
+        current, truth = self.snapshot(), expected.snapshot()
+        pairs = [("count", None, current["count"], truth["count"])]
+        for metric in ("counts", "sums"):
+            for key in current[metric].keys() | truth[metric].keys():
+                pairs.append(
+                    (metric, key, current[metric].get(key, 0), truth[metric].get(key, 0))
+                )
+        return [
+            {"metric": metric, "key": key, "running": running, "recomputed": recomputed}
+            for metric, key, running, recomputed in pairs
+            if abs(running - recomputed) > tolerance * max(1.0, abs(recomputed))
+        ]
@@ -0,0 +1,277 @@
+"""Repository interfaces shared by every storage backend."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .aggregates import GroupTotals
+from .pagination import DEFAULT_SORT, Page, paginate
+
+Record = Dict[str, object]
+
+
+def where(**criteria: Any) -> Dict[str, Any]:
+    """Filter criteria for ``Repository.find`` without the ``None`` (unset) entries."""
+
+    return {field: value for field, value in criteria.items() if value is not None}
+
+
+def accepted(value: Any) -> Tuple[Any, ...]:
+    """Values a field may take for a criterion: a list/tuple/set means any of them."""
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(value)
+    return (value,)
+
+
+def matches(record: Record, criteria: Mapping[str, Any]) -> bool:
+    return all(record.get(field) in accepted(value) for field, value in criteria.items())
+
+
+class Repository(ABC):
+    """Records of one collection keyed by their ``id`` field.
+
+    ``values`` yields records in insertion order; replacing a record keeps
+    its position. Returned records must be treated as read-only: copy before
+    changing and ``put`` the copy back, or use ``update``.
+
+    Fields listed in ``indexes`` have secondary indexes that are changed
+    together with the record, so ``find`` on them never scans the collection
+    and never sees a record under a stale value. ``totals``, when set, is
+    updated with every write the same way.
+    """
+
+    indexes: Sequence[str] = ()
+    totals: Optional[GroupTotals] = None
+    # Held by writes; hold it to see records and totals in the same state.
+    lock: Any = None
+
+    @abstractmethod
+    def get(self, record_id: str) -> Optional[Record]:
+        ...
+
+    @abstractmethod
+    def put(self, record: Record) -> None:
+        """Insert or replace the record stored under ``record["id"]``."""
+
+    def put_many(self, records: Iterable[Record]) -> None:
+        for record in records:
+            self.put(record)
+
+    def update(self, record_id: str, changes: Mapping[str, Any]) -> Optional[Record]:
+        """Merge ``changes`` into a stored record as one step; ``None`` if missing."""
+
+        existing = self.get(record_id)
+        if existing is None:
+            return None
+        record = {**existing, **changes}
+        self.put(record)
+        return record
+
+    @abstractmethod
+    def delete(self, record_id: str) -> bool:
+        """Remove a record; return whether it existed."""
+
+    def find(self, criteria: Mapping[str, Any]) -> List[Record]:
+        """Records whose fields equal (or, for a list, are one of) ``criteria``.
+
+        Results keep insertion order. Indexed fields narrow the candidates;
+        any other field is checked record by record.
+        """
+
+        return [record for record in self.values() if matches(record, criteria)]
+
+    def page(
+        self,
+        criteria: Mapping[str, Any],
+        sort: str = DEFAULT_SORT,
+        descending: bool = False,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """One page of ``find(criteria)`` ordered by ``(sort, id)``.
+
+        ``after`` is the ``next_cursor`` of the previous page. Cursors hold the
+        last sort value and id rather than an offset, so pages stay stable while
+        records are added or removed; a cursor issued for another sort order
+        raises ``ValueError``.
+        """
+
+        return paginate(self.find(criteria), sort, descending, after, limit)
+
+    @abstractmethod
+    def values(self) -> Iterator[Record]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def verify_totals(self, repair: bool = False) -> List[Dict[str, Any]]:
+        """Recompute ``totals`` from the records and report any drift.
+
+        With ``repair`` the running totals are replaced by the recomputed ones.
+        """
+
+        if self.totals is None:
+            return []
+        with self.lock:
+            expected = self.totals.empty()
+            expected.reset(self.values())
+            drift = self.totals.drift(expected)
+            if drift and repair:
+                self.totals.reset(self.values())
+        return drift
+
+    def __contains__(self, record_id: object) -> bool:
+        return isinstance(record_id, str) and self.get(record_id) is not None
+
+
+class RecordLog(ABC):
+    """Append-only records grouped by a parent key (events, reviews, messages)."""
+
+    @abstractmethod
+    def append(self, key: str, record: Record) -> None:
+        ...
+
+    @abstractmethod
+    def list(self, key: str) -> List[Record]:
+        """Records appended under ``key``, oldest first (empty when unknown)."""
+
+    def page(
+        self,
+        key: str,
+        criteria: Mapping[str, Any],
+        sort: str = DEFAULT_SORT,
+        descending: bool = False,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """One page of the records under ``key``, as ``Repository.page``."""
+
+        records = [record for record in self.list(key) if matches(record, criteria)]
+        return paginate(records, sort, descending, after, limit)
+
+    @abstractmethod
+    def items(self) -> Iterator[Tuple[str, Record]]:
+        """Every record across all keys, paired with the key it was appended under."""
+
+    def values(self) -> Iterator[Record]:
+        """Every record across all keys."""
+
+        for _, record in self.items():
+            yield record
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class StorageBackend(ABC):
+    """Opens the repositories and logs of one storage engine."""
+
+    @abstractmethod
+    def repository(
+        self,
+        name: str,
+        indexes: Sequence[str] = (),
+        totals: Optional[GroupTotals] = None,
+    ) -> Repository:
+        ...
+
+    @abstractmethod
+    def log(self, name: str) -> RecordLog:
+        ...
+
+    def flush(self) -> None:
+        """Make buffered writes durable."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class Storage:
+    """Every collection the routers read and write, from one backend."""
+
+    REPOSITORIES = (
+        "emails",
+        "tenants",
+        "intake_records",
+        "leases",
+        "payments",
+        "maintenance_orders",
+        "vendors",
+        "owners",
+        "owner_reports",
+        "documents",
+        "document_extractions",
+        "knowledge_articles",
+        "analytics_dashboards",
+        "inspections",
+        "forecasts",
+    )
+    # Secondary indexes per collection (payments carry no property_id).
+    INDEXES: Dict[str, Tuple[str, ...]] = {
+        "payments": ("tenant_id", "status"),
+        "maintenance_orders": ("tenant_id", "property_id", "status"),
+        "leases": ("tenant_id", "property_id", "status"),
+    }
+    # Running totals per collection: (group-by field, summed amount field).
+    TOTALS: Dict[str, Tuple[str, Optional[str]]] = {
+        "payments": ("status", "amount"),
+        "maintenance_orders": ("status", None),
+        "leases": ("status", None),
+    }
+    LOGS = (
+        "email_feedback",
+        "communications",
+        "lease_tasks",
+        "maintenance_events",
+        "vendor_reviews",
+    )
+    # What the key of each log identifies, as a record field name.
+    LOG_KEYS: Dict[str, str] = {
+        "email_feedback": "item_id",
+        "communications": "tenant_id",
+        "lease_tasks": "lease_id",
+        "maintenance_events": "work_order_id",
+        "vendor_reviews": "vendor_id",
+    }
+
+    emails: Repository
+    email_feedback: RecordLog
+    tenants: Repository
+    intake_records: Repository
+    communications: RecordLog
+    leases: Repository
+    lease_tasks: RecordLog
+    payments: Repository
+    maintenance_orders: Repository
+    maintenance_events: RecordLog
+    vendors: Repository
+    vendor_reviews: RecordLog
+    owners: Repository
+    owner_reports: Repository
+    documents: Repository
+    document_extractions: Repository
+    knowledge_articles: Repository
+    analytics_dashboards: Repository
+    inspections: Repository
+    forecasts: Repository
+
+    def __init__(self, backend: StorageBackend) -> None:
+        self.backend = backend
+        for name in self.REPOSITORIES:
+            totals = GroupTotals(*self.TOTALS[name]) if name in self.TOTALS else None
+            setattr(
+                self, name, backend.repository(name, self.INDEXES.get(name, ()), totals)
+            )
+        for name in self.LOGS:
+            setattr(self, name, backend.log(name))
+
+    def flush(self) -> None:
+        self.backend.flush()
+
+    def close(self) -> None:
+        self.backend.close()
@@ -0,0 +1,102 @@
+"""Streaming NDJSON encoding of collection records."""
+
+from __future__ import annotations
+
+import json
+import re
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+# Lines are buffered into chunks of about this size before being yielded.
+CHUNK_BYTES = 64 * 1024
+
+# ``json.dumps`` with options builds a new encoder per call; reuse one.
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+
+
+def changed_at(record: Dict[str, Any]) -> Optional[str]:
+    """Last-change timestamp of a record (records never updated only have a creation time)."""
+
+    return record.get("updated_at") or record.get("created_at") or record.get("submitted_at")
+
+
+_TIMESTAMP = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})"
+    r"(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,](\d+))?)?)?"
+    r"(Z|[+-]\d{2}(?::?\d{2})?)?",
+    re.IGNORECASE,
+)
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 date or date-time into an aware UTC ``datetime``.
+
+    ``datetime.fromisoformat`` on Python 3.10 rejects the ``Z`` suffix the API
+    writes and fractions that are not 3 or 6 digits, so the fields are read
+    here. Values without an offset are taken as UTC. Raises ``ValueError``.
+    """
+
+    match = _TIMESTAMP.fullmatch(value.strip())
+    if match is None:
+        raise ValueError(f"Invalid ISO 8601 timestamp: {value!r}")
+    year, month, day, hour, minute, second, fraction, offset = match.groups()
+    parsed = datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour or 0),
+        int(minute or 0),
+        int(second or 0),
+        int((fraction or "0")[:6].ljust(6, "0")),
+        tzinfo=timezone.utc,
+    )
+    if offset and offset.upper() != "Z":
+        digits = offset[1:].replace(":", "")
+        shift = timedelta(hours=int(digits[:2]), minutes=int(digits[2:] or 0))
+        parsed -= shift if offset[0] == "+" else -shift
+    return parsed
+
+
+def _changed_since(record: Dict[str, Any], since: datetime) -> bool:
+    try:
+        return parse_timestamp(changed_at(record) or "") >= since
+    except ValueError:
+        # Records without a readable timestamp cannot be placed after ``since``.
+        return False
+
+
+def ndjson_chunks(
+    records: Iterable[Dict[str, Any]],
+    since: Optional[datetime] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """Encode records one JSON document per line, yielding bounded chunks.
+
+    With ``since`` (see ``parse_timestamp``), only records changed at or
+    after that instant are written. Only the current chunk is held in
+    memory, whatever the collection size.
+    """
+
+    buffer = bytearray()
+    for record in records:
+        if since is not None and not _changed_since(record, since):
+            continue
+        buffer += _encode(record).encode()
+        buffer += b"\n"
+        if len(buffer) >= chunk_bytes:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a byte stream incrementally (one gzip member for the whole stream)."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
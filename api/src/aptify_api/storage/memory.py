@@ -0,0 +1,160 @@
+"""Process-local storage over the ``MemoryState`` dictionaries."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Hashable
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..state import STATE, MemoryState
+from .aggregates import GroupTotals
+from .base import Record, RecordLog, Repository, StorageBackend, accepted, matches
+
+
+class MemoryRepository(Repository):
+    """Dict-backed repository; writes and index changes happen under one lock."""
+
+    def __init__(
+        self,
+        records: Dict[str, Record],
+        indexes: Sequence[str] = (),
+        totals: Optional[GroupTotals] = None,
+    ) -> None:
+        self._records = records
+        self.indexes = tuple(indexes)
+        self.totals = totals
+        self.lock = threading.RLock()
+        # Insertion position per id, to return index hits in collection order.
+        self._position: Dict[str, int] = {}
+        self._next_position = 0
+        # field -> value -> ids holding that value.
+        self._index: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in self.indexes}
+        for record in records.values():
+            self._add(record)
+        if totals is not None:
+            totals.reset(records.values())
+
+    def _add(self, record: Record) -> None:
+        record_id = record["id"]
+        if record_id not in self._position:
+            self._position[record_id] = self._next_position
+            self._next_position += 1
+        for field in self.indexes:
+            value = record.get(field)
+            if isinstance(value, Hashable):
+                self._index[field].setdefault(value, set()).add(record_id)
+
+    def _discard(self, record: Record) -> None:
+        for field in self.indexes:
+            value = record.get(field)
+            if not isinstance(value, Hashable):
+                continue
+            ids = self._index[field].get(value)
+            if ids is not None:
+                ids.discard(record["id"])
+                if not ids:
+                    del self._index[field][value]
+
+    def get(self, record_id: str) -> Optional[Record]:
+        return self._records.get(record_id)
+
+    def put(self, record: Record) -> None:
+        with self.lock:
+            self._store(record)
+
+    def _store(self, record: Record) -> None:
+        existing = self._records.get(record["id"])
+        if existing is not None:
+            self._discard(existing)
+        self._records[record["id"]] = record
+        self._add(record)
+        if self.totals is not None:
+            self.totals.replace(existing, record)
+
+    def put_many(self, records: Iterable[Record]) -> None:
+        with self.lock:
+            for record in records:
+                self._store(record)
+
+    def update(self, record_id: str, changes: Mapping[str, Any]) -> Optional[Record]:
+        with self.lock:
+            existing = self._records.get(record_id)
+            if existing is None:
+                return None
+            record = {**existing, **changes}
+            self._store(record)
+            return record
+
+    def delete(self, record_id: str) -> bool:
+        with self.lock:
+            existing = self._records.pop(record_id, None)
+            if existing is None:
+                return False
+            self._discard(existing)
+            del self._position[record_id]
+            if self.totals is not None:
+                self.totals.replace(existing, None)
+            return True
+
+    def find(self, criteria: Mapping[str, Any]) -> List[Record]:
+        indexed = [field for field in criteria if field in self._index]
+        if not indexed:
+            return super().find(criteria)
+        with self.lock:
+            candidates: Optional[Set[str]] = None
+            for field in indexed:
+                hits: Set[str] = set()
+                for value in accepted(criteria[field]):
+                    if isinstance(value, Hashable):
+                        hits.update(self._index[field].get(value, ()))
+                candidates = hits if candidates is None else candidates & hits
+            ordered = sorted(candidates or (), key=self._position.__getitem__)
+            records = [self._records[record_id] for record_id in ordered]
+        return [record for record in records if matches(record, criteria)]
+
+    def values(self) -> Iterator[Record]:
+        # Snapshot the references so writers on other threads can't break iteration.
+        return iter(list(self._records.values()))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._records
+
+
+class MemoryRecordLog(RecordLog):
+    def __init__(self, groups: Dict[str, List[Record]]) -> None:
+        self._groups = groups
+
+    def append(self, key: str, record: Record) -> None:
+        self._groups.setdefault(key, []).append(record)
+
+    def list(self, key: str) -> List[Record]:
+        return list(self._groups.get(key, ()))
+
+    def items(self) -> Iterator[Tuple[str, Record]]:
+        for key, records in list(self._groups.items()):
+            for record in list(records):
+                yield key, record
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in list(self._groups.values()))
+
+
+class MemoryBackend(StorageBackend):
+    """Keeps every collection in a ``MemoryState``; lost on restart."""
+
+    def __init__(self, state: MemoryState = STATE) -> None:
+        self.state = state
+
+    def repository(
+        self,
+        name: str,
+        indexes: Sequence[str] = (),
+        totals: Optional[GroupTotals] = None,
+    ) -> MemoryRepository:
+        return MemoryRepository(getattr(self.state, name), indexes, totals)
+
+    def log(self, name: str) -> MemoryRecordLog:
+        return MemoryRecordLog(getattr(self.state, name))
@@ -0,0 +1,76 @@
+"""Keyset pagination shared by every backend."""
+
+from __future__ import annotations
+
+import base64
+import heapq
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+Record = Dict[str, Any]
+
+DEFAULT_SORT = "created_at"
+
+
+@dataclass
+class Page:
+    items: List[Record] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+def sort_key(record: Record, sort: str) -> Tuple[Any, ...]:
+    """Order by ``sort`` then ``id``; missing values sort first, as in SQL."""
+
+    value = record.get(sort)
+    return (value is not None, value if value is not None else 0, str(record.get("id", "")))
+
+
+def encode_cursor(record: Record, sort: str, descending: bool) -> str:
+    """Opaque cursor pointing just past ``record`` in the given order."""
+
+    payload = json.dumps([sort, descending, record.get(sort), record.get("id")])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, str]:
+    """Return the ``(sort value, id)`` a cursor points past; ``ValueError`` if unusable."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_descending, value, record_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode())
+        )
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if cursor_sort != sort or bool(cursor_descending) != descending:
+        raise ValueError("Cursor was issued for a different sort order")
+    return value, str(record_id)
+
+
+def paginate(
+    records: Iterable[Record],
+    sort: str = DEFAULT_SORT,
+    descending: bool = False,
+    after: Optional[str] = None,
+    limit: int = 50,
+) -> Page:
+    """Page through already-filtered records in memory.
+
+    Keeps only the ``limit + 1`` smallest keys past the cursor, so a page
+    costs one pass over the records rather than a full sort.
+    """
+
+    if after is not None:
+        value, record_id = decode_cursor(after, sort, descending)
+        bound = sort_key({sort: value, "id": record_id}, sort)
+        if descending:
+            records = (record for record in records if sort_key(record, sort) < bound)
+        else:
+            records = (record for record in records if sort_key(record, sort) > bound)
+    pick = heapq.nlargest if descending else heapq.nsmallest
+    items = pick(limit + 1, records, key=lambda record: sort_key(record, sort))
+    if len(items) <= limit:
+        return Page(items)
+    items = items[:limit]
+    return Page(items, encode_cursor(items[-1], sort, descending))
@@ -0,0 +1,382 @@
+"""Durable storage in a single SQLite database (WAL mode, group commits)."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .aggregates import GroupTotals
+from .base import Record, RecordLog, Repository, StorageBackend, accepted
+from .pagination import DEFAULT_SORT, Page, decode_cursor, encode_cursor
+
+# Rows fetched per query when iterating a whole collection.
+SCAN_CHUNK = 500
+
+
+def _dumps(record: Record) -> str:
+    return json.dumps(record, separators=(",", ":"))
+
+
+def _field(name: str) -> str:
+    """SQL expression for a top-level record field (matches the index expressions)."""
+
+    if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", name):
+        raise ValueError(f"Invalid field name {name!r}")
+    return f"json_extract(data, '$.{name}')"
+
+
+class SQLiteBackend(StorageBackend):
+    """One table per collection in a WAL-mode database, written in batches.
+
+    Writes join an open transaction that is committed once ``commit_batch``
+    writes have accumulated or, from a background thread, ``commit_interval``
+    seconds after the first of them, so a burst of requests shares one fsync.
+    A crash can lose at most that window; ``flush``/``close`` commit at once.
+
+    Reads and writes share one connection behind a lock, which lets a request
+    read records that are written but not yet committed. Statements are fixed
+    SQL strings per table (and per filter shape for ``find``), so ``sqlite3``'s
+    statement cache prepares each one once and reuses it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        commit_batch: int = 256,
+        commit_interval: float = 0.05,
+    ) -> None:
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.commit_batch = commit_batch
+        self.commit_interval = commit_interval
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, cached_statements=512
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only syncs at checkpoints and stays crash-consistent.
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self.lock = threading.RLock()
+        self._pending = 0
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if commit_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically, name="sqlite-commit", daemon=True
+            )
+            self._flusher.start()
+
+    @classmethod
+    def from_env(cls) -> "SQLiteBackend":
+        return cls(
+            os.getenv("SQLITE_PATH", "src/aptify_api/db/aptify.sqlite3"),
+            commit_batch=int(os.getenv("SQLITE_COMMIT_BATCH", "256")),
+            commit_interval=float(os.getenv("SQLITE_COMMIT_INTERVAL_MS", "50")) / 1000,
+        )
+
+    def repository(
+        self,
+        name: str,
+        indexes: Sequence[str] = (),
+        totals: Optional[GroupTotals] = None,
+    ) -> "SQLiteRepository":
+        return SQLiteRepository(self, name, indexes, totals)
+
+    def log(self, name: str) -> "SQLiteRecordLog":
+        return SQLiteRecordLog(self, name)
+
+    def execute_schema(self, *statements: str) -> None:
+        with self.lock:
+            for statement in statements:
+                self._conn.execute(statement)
+
+    def read(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self.lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def write(self, sql: str, params: Sequence[Any] = ()) -> int:
+        with self.lock:
+            if not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            rowcount = self._conn.execute(sql, params).rowcount
+            self._written(1)
+            return rowcount
+
+    def write_many(self, sql: str, rows: Iterable[Sequence[Any]]) -> None:
+        with self.lock:
+            if not self._conn.in_transaction:
+                self._conn.execute("BEGIN")
+            cursor = self._conn.executemany(sql, rows)
+            self._written(max(cursor.rowcount, 1))
+
+    def _written(self, count: int) -> None:
+        self._pending += count
+        if self._pending >= self.commit_batch:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._conn.in_transaction:
+            self._conn.execute("COMMIT")
+        self._pending = 0
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.wait(self.commit_interval):
+            if self._pending:
+                self.flush()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._commit()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self.lock:
+            if self._conn is not None:
+                self._commit()
+                self._conn.close()
+                self._conn = None
+
+
+class SQLiteRepository(Repository):
+    """Records as JSON text; indexed fields get expression indexes.
+
+    SQLite updates an expression index in the same statement as the row, so
+    index entries can't disagree with the stored JSON. ``totals`` live in
+    process memory: they are loaded with one ``GROUP BY`` when the table is
+    opened and then follow this process's writes, so only one process should
+    write to the database.
+    """
+
+    def __init__(
+        self,
+        db: SQLiteBackend,
+        table: str,
+        indexes: Sequence[str] = (),
+        totals: Optional[GroupTotals] = None,
+    ) -> None:
+        self._db = db
+        self._table = table
+        self.indexes = tuple(indexes)
+        self.totals = totals
+        self.lock = db.lock
+        db.execute_schema(
+            f'CREATE TABLE IF NOT EXISTS "{table}" (id TEXT PRIMARY KEY, data TEXT NOT NULL)',
+            *(
+                f'CREATE INDEX IF NOT EXISTS "{table}_{field}" ON "{table}" ({_field(field)})'
+                for field in self.indexes
+            ),
+            # Serves the default list order without sorting the table.
+            f'CREATE INDEX IF NOT EXISTS "{table}_{DEFAULT_SORT}_id" '
+            f'ON "{table}" ({_field(DEFAULT_SORT)}, id)',
+        )
+        # The upsert keeps the rowid of a replaced record, so scans stay in
+        # insertion order.
+        self._sql_put = (
+            f'INSERT INTO "{table}" (id, data) VALUES (?, ?) '
+            "ON CONFLICT(id) DO UPDATE SET data = excluded.data"
+        )
+        self._sql_get = f'SELECT data FROM "{table}" WHERE id = ?'
+        self._sql_contains = f'SELECT 1 FROM "{table}" WHERE id = ?'
+        self._sql_delete = f'DELETE FROM "{table}" WHERE id = ?'
+        self._sql_scan = (
+            f'SELECT rowid, data FROM "{table}" WHERE rowid > ? ORDER BY rowid LIMIT ?'
+        )
+        self._sql_count = f'SELECT COUNT(*) FROM "{table}"'
+        if totals is not None:
+            amount = _field(totals.amount) if totals.amount else "0"
+            totals.load(
+                db.read(
+                    f"SELECT {_field(totals.field)}, COUNT(*), TOTAL({amount}) "
+                    f'FROM "{table}" GROUP BY 1'
+                )
+            )
+
+    def get(self, record_id: str) -> Optional[Record]:
+        rows = self._db.read(self._sql_get, (record_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def _get_many(self, record_ids: Sequence[str]) -> Dict[str, Record]:
+        rows = self._db.read(
+            f'SELECT id, data FROM "{self._table}" '
+            f"WHERE id IN ({', '.join('?' * len(record_ids))})",
+            record_ids,
+        )
+        return {record_id: json.loads(data) for record_id, data in rows}
+
+    def put(self, record: Record) -> None:
+        if self.totals is None:
+            self._db.write(self._sql_put, (record["id"], _dumps(record)))
+            return
+        with self.lock:
+            existing = self.get(record["id"])
+            self._db.write(self._sql_put, (record["id"], _dumps(record)))
+            self.totals.replace(existing, record)
+
+    def put_many(self, records: Iterable[Record]) -> None:
+        if self.totals is None:
+            self._db.write_many(
+                self._sql_put, ((record["id"], _dumps(record)) for record in records)
+            )
+            return
+        records = list(records)
+        with self.lock:
+            for start in range(0, len(records), SCAN_CHUNK):
+                chunk = records[start : start + SCAN_CHUNK]
+                latest = self._get_many([record["id"] for record in chunk])
+                self._db.write_many(
+                    self._sql_put, ((record["id"], _dumps(record)) for record in chunk)
+                )
+                for record in chunk:
+                    self.totals.replace(latest.get(record["id"]), record)
+                    latest[record["id"]] = record
+
+    def update(self, record_id: str, changes: Mapping[str, Any]) -> Optional[Record]:
+        with self._db.lock:
+            existing = self.get(record_id)
+            if existing is None:
+                return None
+            record = {**existing, **changes}
+            self.put(record)
+            return record
+
+    def delete(self, record_id: str) -> bool:
+        if self.totals is None:
+            return self._db.write(self._sql_delete, (record_id,)) > 0
+        with self.lock:
+            existing = self.get(record_id)
+            if existing is None:
+                return False
+            self._db.write(self._sql_delete, (record_id,))
+            self.totals.replace(existing, None)
+            return True
+
+    @staticmethod
+    def _where(criteria: Mapping[str, Any]) -> Optional[Tuple[List[str], List[Any]]]:
+        """SQL clauses and parameters for ``criteria``; ``None`` if nothing can match."""
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        for field, value in criteria.items():
+            values = accepted(value)
+            if not values:
+                return None
+            if len(values) == 1:
+                clauses.append(f"{_field(field)} = ?")
+            else:
+                clauses.append(f"{_field(field)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return clauses, params
+
+    def _select(self, clauses: List[str], params: List[Any], tail: str) -> List[Record]:
+        sql = f'SELECT data FROM "{self._table}"'
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return [json.loads(data) for (data,) in self._db.read(f"{sql} {tail}", params)]
+
+    def find(self, criteria: Mapping[str, Any]) -> List[Record]:
+        where = self._where(criteria)
+        if where is None:
+            return []
+        return self._select(*where, "ORDER BY rowid")
+
+    def page(
+        self,
+        criteria: Mapping[str, Any],
+        sort: str = DEFAULT_SORT,
+        descending: bool = False,
+        after: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        where = self._where(criteria)
+        if where is None:
+            return Page()
+        clauses, params = where
+        column = "id" if sort == "id" else _field(sort)
+        if after is not None:
+            value, last_id = decode_cursor(after, sort, descending)
+            # NULL sorts first ascending and last descending, as in sort_key.
+            if value is None and not descending:
+                clauses.append(f"({column} IS NOT NULL OR ({column} IS NULL AND id > ?))")
+                params.append(last_id)
+            elif value is None:
+                clauses.append(f"({column} IS NULL AND id < ?)")
+                params.append(last_id)
+            elif not descending:
+                clauses.append(f"({column} > ? OR ({column} = ? AND id > ?))")
+                params.extend([value, value, last_id])
+            else:
+                clauses.append(
+                    f"({column} < ? OR {column} IS NULL OR ({column} = ? AND id < ?))"
+                )
+                params.extend([value, value, last_id])
+        direction = "DESC" if descending else "ASC"
+        items = self._select(
+            clauses,
+            params + [limit + 1],
+            f"ORDER BY {column} {direction}, id {direction} LIMIT ?",
+        )
+        if len(items) <= limit:
+            return Page(items)
+        items = items[:limit]
+        return Page(items, encode_cursor(items[-1], sort, descending))
+
+    def values(self) -> Iterator[Record]:
+        last = 0
+        while True:
+            rows = self._db.read(self._sql_scan, (last, SCAN_CHUNK))
+            for _, data in rows:
+                yield json.loads(data)
+            if len(rows) < SCAN_CHUNK:
+                return
+            last = rows[-1][0]
+
+    def __len__(self) -> int:
+        return self._db.read(self._sql_count)[0][0]
+
+    def __contains__(self, record_id: object) -> bool:
+        return isinstance(record_id, str) and bool(
+            self._db.read(self._sql_contains, (record_id,))
+        )
+
+
+class SQLiteRecordLog(RecordLog):
+    def __init__(self, db: SQLiteBackend, table: str) -> None:
+        self._db = db
+        db.execute_schema(
+            f'CREATE TABLE IF NOT EXISTS "{table}" (key TEXT NOT NULL, data TEXT NOT NULL)',
+            f'CREATE INDEX IF NOT EXISTS "{table}_key" ON "{table}" (key)',
+        )
+        self._sql_append = f'INSERT INTO "{table}" (key, data) VALUES (?, ?)'
+        self._sql_list = f'SELECT data FROM "{table}" WHERE key = ? ORDER BY rowid'
+        self._sql_scan = (
+            f'SELECT rowid, key, data FROM "{table}" '
+            "WHERE rowid > ? ORDER BY rowid LIMIT ?"
+        )
+        self._sql_count = f'SELECT COUNT(*) FROM "{table}"'
+
+    def append(self, key: str, record: Record) -> None:
+        self._db.write(self._sql_append, (key, _dumps(record)))
+
+    def list(self, key: str) -> List[Record]:
+        return [json.loads(data) for (data,) in self._db.read(self._sql_list, (key,))]
+
+    def items(self) -> Iterator[Tuple[str, Record]]:
+        last = 0
+        while True:
+            rows = self._db.read(self._sql_scan, (last, SCAN_CHUNK))
+            for _, key, data in rows:
+                yield key, json.loads(data)
+            if len(rows) < SCAN_CHUNK:
+                return
+            last = rows[-1][0]
+
+    def __len__(self) -> int:
+        return self._db.read(self._sql_count)[0][0]
@@ -2,13 +2,20 @@
 
 from .helpers import generate_id, timestamp, with_audit  # noqa: F401
 from .init_vector_db import initialize_vectorstore  # noqa: F401
-from .rag import GraphState, RagGraphNodes  # noqa: F401
+from .pagination import SORTABLE, Page, PageQuery, fetch_page, page_query  # noqa: F401
+from .rag import GraphState, RagBudget, RagGraphNodes  # noqa: F401
 
 __all__ = [
     "generate_id",
     "timestamp",
     "with_audit",
     "initialize_vectorstore",
+    "Page",
+    "PageQuery",
+    "SORTABLE",
+    "fetch_page",
+    "page_query",
     "GraphState",
+    "RagBudget",
     "RagGraphNodes",
 ]
@@ -0,0 +1,143 @@
+"""Semantic cache for knowledge answers keyed by question embeddings."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+@dataclass
+class CachedAnswer:
+    """A stored answer together with the data needed to match and expire it."""
+
+    question: str
+    vector: np.ndarray
+    answer: str
+    sources: List[Dict[str, str]]
+    generated_at: str
+    stored_at: float
+
+
+class SemanticAnswerCache:
+    """LRU + TTL cache returning answers for semantically equivalent questions.
+
+    A lookup embeds the question and returns the most similar stored entry
+    whose cosine similarity reaches ``threshold``. Entries are dropped when
+    ``version()`` changes, which callers tie to vector-store rebuilds.
+    ``embedding`` returns the model and is only called on the first lookup.
+    """
+
+    def __init__(
+        self,
+        embedding: Callable[[], Embeddings],
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600.0,
+        max_entries: int = 512,
+        version: Optional[Callable[[], Hashable]] = None,
+    ) -> None:
+        self._embedding = embedding
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._version = version or (lambda: None)
+        self._seen_version = self._version()
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self._embedding().embed_query(question), dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def _check_version(self) -> None:
+        current = self._version()
+        if current != self._seen_version:
+            self._seen_version = current
+            if self._entries:
+                self._entries.clear()
+                self.invalidations += 1
+
+    def _expire(self, now: float) -> None:
+        stale = [
+            key
+            for key, entry in self._entries.items()
+            if now - entry.stored_at > self.ttl_seconds
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.expirations += len(stale)
+
+    def lookup(self, question: str) -> Optional[CachedAnswer]:
+        """Return the best cached answer for ``question`` or ``None``."""
+
+        vector = self._embed(question)
+        with self._lock:
+            self._check_version()
+            self._expire(time.monotonic())
+            if not self._entries:
+                self.misses += 1
+                return None
+            keys = list(self._entries)
+            matrix = np.stack([self._entries[key].vector for key in keys])
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.threshold:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(keys[best])
+            self.hits += 1
+            return self._entries[keys[best]]
+
+    def store(
+        self,
+        question: str,
+        answer: str,
+        sources: List[Dict[str, str]],
+        generated_at: str,
+    ) -> None:
+        """Remember ``answer`` for ``question``, evicting the LRU entry if full."""
+
+        entry = CachedAnswer(
+            question=question,
+            vector=self._embed(question),
+            answer=answer,
+            sources=sources,
+            generated_at=generated_at,
+            stored_at=time.monotonic(),
+        )
+        with self._lock:
+            self._check_version()
+            self._entries[question] = entry
+            self._entries.move_to_end(question)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
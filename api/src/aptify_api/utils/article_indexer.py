@@ -0,0 +1,185 @@
+"""Background indexing of knowledge articles into the shared vector store."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+
+from langchain_core.documents import Document
+
+from .embedding_pipeline import PipelineConfig
+from .init_vector_db import (
+    delete_source,
+    replace_source,
+    source_chunks,
+    stored_chunk_ids,
+)
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+_DELETE = object()
+
+SOURCE_PREFIX = "article:"
+
+
+def article_source(article_id: str) -> str:
+    return f"{SOURCE_PREFIX}{article_id}"
+
+
+def article_document(article: Dict[str, Any]) -> Document:
+    """Render an article record as a single document for splitting."""
+
+    return Document(
+        page_content=f"{article['title']}\n\n{article['body']}",
+        metadata={
+            "source": article_source(article["id"]),
+            "article_id": article["id"],
+            "title": article["title"],
+            # Chroma metadata values must be scalars.
+            "tags": ",".join(article.get("tags") or []),
+        },
+    )
+
+
+class ArticleIndexer:
+    """Split, embed and upsert articles on one worker thread.
+
+    ``submit``/``remove`` only record the latest wanted state of an article
+    and return immediately; several edits queued before the worker gets to
+    an article collapse into one write. ``status`` reports ``pending``,
+    ``indexed`` or ``failed`` per stored article; removed articles are
+    forgotten once their chunks are gone.
+    """
+
+    def __init__(
+        self,
+        vectorstore: Callable[[], Any],
+        config: Optional[PipelineConfig] = None,
+    ) -> None:
+        self._vectorstore = vectorstore
+        # Articles are small: no worker processes, no global thread override.
+        self.config = config or PipelineConfig(
+            batch_size=PipelineConfig.from_env().batch_size
+        )
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pending: Dict[str, Any] = {}
+        self._status: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _enqueue(self, article_id: str, wanted: Any) -> None:
+        with self._lock:
+            queued = article_id in self._pending
+            self._pending[article_id] = wanted
+            self._status[article_id] = "pending"
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="article-indexer", daemon=True
+                )
+                self._thread.start()
+        if not queued:
+            self._queue.put(article_id)
+
+    def submit(self, article: Dict[str, Any]) -> None:
+        """Index ``article`` (a knowledge record), replacing earlier chunks."""
+
+        self._enqueue(article["id"], dict(article))
+
+    def remove(self, article_id: str) -> None:
+        """Drop every chunk of ``article_id`` from the store."""
+
+        self._enqueue(article_id, _DELETE)
+
+    def status(self, article_id: str) -> Optional[str]:
+        with self._lock:
+            return self._status.get(article_id)
+
+    def reconcile(self, articles: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Bring the store in line with ``articles`` after a restart.
+
+        Statuses and queued edits do not survive the process: articles whose
+        chunks are missing or out of date are re-submitted, chunks of
+        articles no longer stored are removed, and the rest are reported as
+        ``indexed``. Returns how many articles took each path.
+        """
+
+        stored: Dict[str, Set[str]] = defaultdict(set)
+        for chunk_id in stored_chunk_ids(self._vectorstore(), SOURCE_PREFIX):
+            source = chunk_id.split("#", 1)[0]
+            stored[source[len(SOURCE_PREFIX):]].add(chunk_id)
+
+        counts = {"indexed": 0, "submitted": 0, "removed": 0}
+        for article in articles:
+            ids, _ = source_chunks(
+                article_source(article["id"]), [article_document(article)]
+            )
+            if set(ids) == stored.pop(article["id"], set()):
+                with self._lock:
+                    self._status.setdefault(article["id"], "indexed")
+                counts["indexed"] += 1
+            else:
+                self.submit(article)
+                counts["submitted"] += 1
+        for article_id in stored:
+            self.remove(article_id)
+            counts["removed"] += 1
+        logger.info("Reconciled article index: %s", counts)
+        return counts
+
+    def _run(self) -> None:
+        while True:
+            article_id = self._queue.get()
+            try:
+                if article_id is _STOP:
+                    return
+                with self._lock:
+                    wanted = self._pending.pop(article_id)
+                self._apply(article_id, wanted)
+            finally:
+                self._queue.task_done()
+
+    def _apply(self, article_id: str, wanted: Any) -> None:
+        try:
+            vectorstore = self._vectorstore()
+            if wanted is _DELETE:
+                delete_source(vectorstore, article_source(article_id))
+                outcome = "removed"
+            else:
+                replace_source(
+                    vectorstore,
+                    article_source(article_id),
+                    [article_document(wanted)],
+                    self.config,
+                )
+                outcome = "indexed"
+        except Exception:
+            logger.exception("Indexing article %s failed", article_id)
+            outcome = "failed"
+        with self._lock:
+            # A newer edit may have arrived while this one was being written.
+            if article_id in self._pending:
+                return
+            if wanted is _DELETE:
+                # Nothing asks about a deleted article; a failed delete is
+                # retried by the next ``reconcile``.
+                self._status.pop(article_id, None)
+            else:
+                self._status[article_id] = outcome
+
+    def join(self) -> None:
+        """Block until every queued article has been written."""
+
+        self._queue.join()
+
+    def stop(self) -> None:
+        """Finish queued work and stop the worker thread."""
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
@@ -0,0 +1,120 @@
+"""Pack retrieved chunks into a bounded prompt context."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# Rough size of a token in English text; only used to budget prompt context.
+CHARS_PER_TOKEN = 4
+# Chunks are split with a 200-character overlap; search a little wider.
+MAX_OVERLAP = 400
+# Shorter shared edges are treated as coincidence, not split overlap.
+MIN_OVERLAP = 30
+# Don't bother appending a block cut down to less than this.
+MIN_BLOCK_CHARS = 200
+
+
+def _overlap(head: str, tail: str) -> int:
+    """Length of the longest suffix of ``head`` that is a prefix of ``tail``."""
+
+    window = head[-MAX_OVERLAP:]
+    probe = tail[:MIN_OVERLAP]
+    if len(probe) < MIN_OVERLAP:
+        return 0
+    position = window.find(probe)
+    while position != -1:
+        size = len(window) - position
+        if tail.startswith(window[position:]):
+            return size
+        position = window.find(probe, position + 1)
+    return 0
+
+
+def _merge(segment: str, chunk: str) -> Optional[str]:
+    """Join two texts that contain or overlap each other, else ``None``."""
+
+    if chunk in segment:
+        return segment
+    if segment in chunk:
+        return chunk
+    size = _overlap(segment, chunk)
+    if size:
+        return segment + chunk[size:]
+    size = _overlap(chunk, segment)
+    if size:
+        return chunk + segment[size:]
+    return None
+
+
+def _merge_all(texts: List[str]) -> List[str]:
+    segments: List[str] = []
+    for text in texts:
+        # A merge can make a segment overlap an earlier one, so keep folding.
+        while True:
+            for index, segment in enumerate(segments):
+                merged = _merge(segment, text)
+                if merged is not None:
+                    del segments[index]
+                    text = merged
+                    break
+            else:
+                break
+        segments.append(text)
+    return segments
+
+
+def _label(metadata: Dict[str, Any]) -> str:
+    label = str(metadata.get("title") or metadata.get("source") or "document")
+    if metadata.get("page") is not None:
+        label += f" p.{int(metadata['page']) + 1}"
+    return label
+
+
+def pack_context(documents: Any, max_tokens: Optional[int] = None) -> str:
+    """Render ``documents`` (best first) as numbered plain-text blocks.
+
+    Chunks from the same source page are merged where the splitter overlap
+    makes them adjacent, and text already present elsewhere is dropped.
+    Blocks keep the rank of their best chunk; with ``max_tokens`` blocks are
+    added until the budget is spent and the last one is cut at a word
+    boundary.
+    """
+
+    if isinstance(documents, Document):
+        documents = [documents]
+    groups: Dict[Tuple[str, Any], List[str]] = {}
+    labels: Dict[Tuple[str, Any], str] = {}
+    for document in documents or []:
+        text = " ".join(str(getattr(document, "page_content", "") or "").split())
+        if not text:
+            continue
+        metadata = getattr(document, "metadata", None) or {}
+        key = (str(metadata.get("source")), metadata.get("page"))
+        # dicts keep insertion order, i.e. the rank of each group's best chunk.
+        groups.setdefault(key, []).append(text)
+        labels.setdefault(key, _label(metadata))
+
+    blocks: List[Tuple[str, str]] = []
+    seen: List[str] = []
+    for key, texts in groups.items():
+        for segment in _merge_all(texts):
+            if any(segment in other for other in seen):
+                continue
+            seen.append(segment)
+            blocks.append((labels[key], segment))
+
+    budget = max_tokens * CHARS_PER_TOKEN if max_tokens is not None else None
+    parts: List[str] = []
+    used = 0
+    for number, (label, segment) in enumerate(blocks, start=1):
+        block = f"[{number}] {label}\n{segment}"
+        if budget is not None and used + len(block) > budget:
+            room = budget - used
+            if room >= MIN_BLOCK_CHARS:
+                parts.append(block[:room].rsplit(" ", 1)[0])
+            break
+        parts.append(block)
+        used += len(block) + 2
+    return "\n\n".join(parts)
@@ -0,0 +1,186 @@
+"""Persistent on-disk cache of chunk embeddings."""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_KEY_BYTES = 32  # sha256 digest
+
+
+class EmbeddingStore:
+    """Append-only float32 matrix on disk with a digest -> row offset index.
+
+    ``vectors.f32`` holds one row per cached chunk and is read through a
+    read-only ``np.memmap``; ``keys.bin`` holds the matching 32-byte digests
+    in row order and is loaded into a dict on open. Appends hold an exclusive
+    ``flock`` and first trim any rows left over from an interrupted append,
+    so a build CLI and a server process can share one cache directory.
+    """
+
+    def __init__(self, directory: str, model_name: str) -> None:
+        self.directory = directory
+        self.model_name = model_name
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._keys_path = os.path.join(directory, "keys.bin")
+        self._meta_path = os.path.join(directory, "meta.json")
+        self._lock_path = os.path.join(directory, ".lock")
+        self._lock = threading.Lock()
+        self._offsets: Dict[bytes, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self.dim: Optional[int] = None
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as handle:
+                meta = json.load(handle)
+        except FileNotFoundError:
+            return
+        if meta.get("model") != self.model_name:
+            raise ValueError(
+                f"Embedding cache at {self.directory} belongs to {meta.get('model')}"
+            )
+        self.dim = int(meta["dim"])
+        if not os.path.exists(self._keys_path) or not os.path.exists(self._vectors_path):
+            return
+        with open(self._keys_path, "rb") as handle:
+            keys = handle.read()
+        rows = self._complete_rows()
+        self._offsets = {
+            keys[row * _KEY_BYTES : (row + 1) * _KEY_BYTES]: row for row in range(rows)
+        }
+        self._remap(rows)
+
+    def _complete_rows(self) -> int:
+        """Rows that have both a vector and a key on disk."""
+
+        def size(path: str) -> int:
+            return os.path.getsize(path) if os.path.exists(path) else 0
+
+        return min(
+            size(self._keys_path) // _KEY_BYTES,
+            size(self._vectors_path) // (self.dim * 4),
+        )
+
+    def _remap(self, rows: int) -> None:
+        self._matrix = (
+            np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim)
+            )
+            if rows
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).digest()
+
+    def get(self, keys: List[bytes]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            matrix = self._matrix
+            return [
+                np.array(matrix[self._offsets[key]])
+                if key in self._offsets and matrix is not None
+                else None
+                for key in keys
+            ]
+
+    def put(self, keys: List[bytes], vectors: np.ndarray) -> None:
+        with self._lock:
+            fresh = [
+                (index, key)
+                for index, key in enumerate(keys)
+                if key not in self._offsets
+            ]
+            if not fresh:
+                return
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                with open(self._meta_path, "w", encoding="utf-8") as handle:
+                    json.dump({"model": self.model_name, "dim": self.dim}, handle)
+            rows = np.ascontiguousarray(
+                vectors[[index for index, _ in fresh]], dtype=np.float32
+            )
+            with open(self._lock_path, "a") as lock_handle:
+                fcntl.flock(lock_handle, fcntl.LOCK_EX)
+                try:
+                    # Other processes may have appended since we loaded, and an
+                    # interrupted append may have left a partial tail: trim to
+                    # complete rows and number ours from there.
+                    start = self._complete_rows()
+                    with open(self._vectors_path, "ab") as handle:
+                        handle.truncate(start * self.dim * 4)
+                        handle.write(rows.tobytes())
+                    with open(self._keys_path, "ab") as handle:
+                        handle.truncate(start * _KEY_BYTES)
+                        handle.write(b"".join(key for _, key in fresh))
+                finally:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+            for row, (_, key) in enumerate(fresh, start=start):
+                self._offsets[key] = row
+            self._remap(start + len(fresh))
+
+
+class CachedEmbeddings(Embeddings):
+    """Wrap an embedding model so repeated chunk texts are never re-embedded.
+
+    Only ``embed_documents`` is cached; queries are one-off and go straight
+    to the wrapped model.
+    """
+
+    def __init__(self, base: Embeddings, store: EmbeddingStore) -> None:
+        self.base = base
+        self.store = store
+        self.model_name = store.model_name
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def for_model(
+        cls, base: Embeddings, model_name: str, root: str
+    ) -> "CachedEmbeddings":
+        subdir = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+        return cls(base, EmbeddingStore(os.path.join(root, subdir), model_name))
+
+    def with_base(self, base: Embeddings) -> "CachedEmbeddings":
+        """Share this cache with a different backend for the same model."""
+
+        return CachedEmbeddings(base, self.store)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self.store.key(text) for text in texts]
+        results = self.store.get(keys)
+        missing: Dict[bytes, str] = {}
+        for key, text, vector in zip(keys, texts, results):
+            if vector is None:
+                missing.setdefault(key, text)
+        self.hits += len(texts) - sum(vector is None for vector in results)
+        self.misses += len(missing)
+        if missing:
+            miss_keys = list(missing)
+            computed = np.asarray(
+                self.base.embed_documents([missing[key] for key in miss_keys]),
+                dtype=np.float32,
+            )
+            self.store.put(miss_keys, computed)
+            by_key = dict(zip(miss_keys, computed))
+            results = [
+                vector if vector is not None else by_key[key]
+                for key, vector in zip(keys, results)
+            ]
+        return [vector.tolist() for vector in results]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.base.embed_query(text)
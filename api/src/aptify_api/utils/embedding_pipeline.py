@@ -0,0 +1,192 @@
+"""Streaming, batched embedding pipeline for vector-store builds."""
+
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# (source key, chunk ids, chunks) for one parsed file
+SourceChunks = Tuple[str, List[str], List[Document]]
+# Stores one batch: (chunk ids, vectors, chunks)
+WriteBatch = Callable[[List[str], List[List[float]], List[Document]], None]
+
+_DONE = object()
+
+
+@dataclass
+class PipelineConfig:
+    """Knobs for corpus builds, read from the environment by default."""
+
+    batch_size: int = 64
+    num_threads: Optional[int] = None
+    num_workers: int = 0
+    prefetch_files: int = 4
+
+    @classmethod
+    def from_env(cls) -> "PipelineConfig":
+        threads = os.getenv("EMBED_THREADS")
+        return cls(
+            batch_size=int(os.getenv("EMBED_BATCH_SIZE", "64")),
+            num_threads=int(threads) if threads else None,
+            num_workers=int(os.getenv("EMBED_WORKERS", "0")),
+            prefetch_files=int(os.getenv("EMBED_PREFETCH_FILES", "4")),
+        )
+
+
+@dataclass
+class BuildStats:
+    """Throughput figures for one pipeline run."""
+
+    files: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Embedded {self.chunks} chunks from {self.files} files in "
+            f"{self.seconds:.1f}s ({self.chunks_per_second:.1f} chunks/sec)"
+        )
+
+
+class ProcessPoolEmbeddings(Embeddings):
+    """Sentence-transformers model fanned out over a pool of CPU processes.
+
+    The pool is started once per build rather than per ``embed_documents``
+    call, which is what ``HuggingFaceEmbeddings(multi_process=True)`` does.
+    """
+
+    def __init__(self, model_name: str, workers: int, batch_size: int) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.batch_size = batch_size
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self._pool = self._model.start_multi_process_pool(["cpu"] * workers)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts, pool=self._pool, batch_size=self.batch_size
+        )
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def close(self) -> None:
+        self._model.stop_multi_process_pool(self._pool)
+
+
+def _prefetch(sources: Iterable[SourceChunks], depth: int) -> Iterator[SourceChunks]:
+    """Parse files on a background thread so PDF loading overlaps embedding."""
+
+    buffer: "queue.Queue[Any]" = queue.Queue(maxsize=max(depth, 1))
+
+    def produce() -> None:
+        try:
+            for item in sources:
+                buffer.put(item)
+        except BaseException as exc:  # re-raised on the consuming thread
+            buffer.put(exc)
+        buffer.put(_DONE)
+
+    threading.Thread(target=produce, name="embed-prefetch", daemon=True).start()
+    while True:
+        item = buffer.get()
+        if item is _DONE:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
+
+def run_pipeline(
+    write: WriteBatch,
+    embedding: Embeddings,
+    sources: Iterable[SourceChunks],
+    config: Optional[PipelineConfig] = None,
+    on_file_done: Optional[Callable[[str, List[str]], None]] = None,
+    on_batch: Optional[Callable[[List[str], List[Document]], None]] = None,
+) -> BuildStats:
+    """Embed ``sources`` in fixed-size batches and hand each batch to ``write``.
+
+    At most ``batch_size`` chunks (plus ``prefetch_files`` parsed files) are
+    held in memory at once. ``on_file_done`` fires once every chunk of a file
+    has been written, so callers can checkpoint progress; ``on_batch``
+    receives the ids and chunks of every batch right after its upsert.
+    """
+
+    config = config or PipelineConfig.from_env()
+    # Look through a CachedEmbeddings wrapper to the actual model.
+    base = getattr(embedding, "base", embedding)
+    if config.num_threads and getattr(base, "backend", "torch") == "torch":
+        import torch
+
+        torch.set_num_threads(config.num_threads)
+
+    pool: Optional[ProcessPoolEmbeddings] = None
+    if config.num_workers > 0:
+        # Only the torch sentence-transformers backend can be fanned out.
+        model_name = getattr(base, "model_name", None)
+        if model_name is None:
+            raise ValueError("Multi-process embedding needs a sentence-transformers model")
+        pool = ProcessPoolEmbeddings(model_name, config.num_workers, config.batch_size)
+        # Keep a disk cache in front of the pool when the caller had one.
+        with_base = getattr(embedding, "with_base", None)
+        embedding = with_base(pool) if with_base is not None else pool
+
+    stats = BuildStats()
+    remaining: dict = {}
+    batch: List[Tuple[str, str, Document]] = []
+
+    def flush() -> None:
+        ids = [chunk_id for _, chunk_id, _ in batch]
+        documents = [document for _, _, document in batch]
+        vectors = embedding.embed_documents(
+            [document.page_content for document in documents]
+        )
+        write(ids, vectors, documents)
+        if on_batch is not None:
+            on_batch(ids, documents)
+        stats.chunks += len(batch)
+        for key, _, _ in batch:
+            remaining[key][0] -= 1
+            if remaining[key][0] == 0:
+                _, file_ids = remaining.pop(key)
+                if on_file_done is not None:
+                    on_file_done(key, file_ids)
+        batch.clear()
+
+    started = time.perf_counter()
+    try:
+        for key, ids, chunks in _prefetch(sources, config.prefetch_files):
+            stats.files += 1
+            if not chunks:
+                if on_file_done is not None:
+                    on_file_done(key, ids)
+                continue
+            remaining[key] = [len(chunks), ids]
+            for chunk_id, chunk in zip(ids, chunks):
+                batch.append((key, chunk_id, chunk))
+                if len(batch) >= config.batch_size:
+                    flush()
+        if batch:
+            flush()
+    finally:
+        if pool is not None:
+            pool.close()
+    stats.seconds = time.perf_counter() - started
+    logger.info("%s", stats)
+    return stats
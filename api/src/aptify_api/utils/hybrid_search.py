@@ -0,0 +1,190 @@
+"""Lexical BM25 index and hybrid (BM25 + dense) retrieval with rank fusion."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForRetrieverRun,
+    CallbackManagerForRetrieverRun,
+)
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import ConfigDict
+
+# Keeps statutory tokens such as "17a", "s94" or "2.3" intact.
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it of on or that the this to "
+    "was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens with common stopwords removed."""
+
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in _STOPWORDS
+    ]
+
+
+class BM25Index:
+    """Incrementally maintained inverted index scored with Okapi BM25.
+
+    Documents are keyed by ``Document.id`` so the index can mirror the Chroma
+    collection chunk for chunk: upserts replace, removals drop postings.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._documents: Dict[str, Document] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _remove_locked(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self._documents.pop(doc_id, None)
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def add(self, documents: Iterable[Document]) -> None:
+        """Insert or replace documents; each must carry an ``id``."""
+
+        with self._lock:
+            for document in documents:
+                if document.id is None:
+                    raise ValueError("BM25Index documents need an id")
+                self._remove_locked(document.id)
+                terms = Counter(tokenize(document.page_content))
+                self._doc_terms[document.id] = terms
+                self._documents[document.id] = document
+                self._doc_lengths[document.id] = sum(terms.values())
+                self._total_length += self._doc_lengths[document.id]
+                for term, frequency in terms.items():
+                    self._postings.setdefault(term, {})[document.id] = frequency
+
+    def remove(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                self._remove_locked(doc_id)
+
+    def apply_change(self, removed: List[str], added: List[Document]) -> None:
+        """Mirror a collection write; matches ``init_vector_db.ChangeListener``."""
+
+        with self._lock:
+            self.remove(removed)
+            self.add(added)
+
+    def search(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """Return the ``k`` best-scoring documents for ``query``."""
+
+        with self._lock:
+            total = len(self._documents)
+            if not total:
+                return []
+            average_length = self._total_length / total or 1.0
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                frequency = len(postings)
+                idf = math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+                for doc_id, tf in postings.items():
+                    length = self._doc_lengths[doc_id]
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (
+                        self.k1 + 1
+                    ) / norm
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [(self._documents[doc_id], score) for doc_id, score in best]
+
+    @classmethod
+    def from_collection(cls, collection: Any, page_size: int = 5000) -> "BM25Index":
+        """Build an index from every chunk stored in a Chroma collection."""
+
+        index = cls()
+        offset = 0
+        while True:
+            page = collection.get(
+                include=["documents", "metadatas"], limit=page_size, offset=offset
+            )
+            ids = page["ids"]
+            if not ids:
+                break
+            index.add(
+                Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+                for doc_id, text, metadata in zip(
+                    ids, page["documents"], page["metadatas"]
+                )
+            )
+            offset += len(ids)
+        return index
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[List[Document]], k: int, rrf_k: int = 60
+) -> List[Document]:
+    """Merge ranked lists by summing ``1 / (rrf_k + rank)`` per document."""
+
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            key = document.id or document.page_content
+            documents.setdefault(key, document)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ordered[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """Dense Chroma search fused with BM25 keyword search.
+
+    Exact terms such as form names or section numbers that embeddings blur
+    are recovered by the lexical side; both lists are merged with RRF.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    vectorstore: Any
+    index: BM25Index
+    k: int = 4
+    fetch_k: int = 10
+    rrf_k: int = 60
+
+    def _fuse(self, query: str, dense: List[Document]) -> List[Document]:
+        lexical = [document for document, _ in self.index.search(query, self.fetch_k)]
+        return reciprocal_rank_fusion([dense, lexical], self.k, self.rrf_k)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense = self.vectorstore.similarity_search(query, k=self.fetch_k)
+        return self._fuse(query, dense)
+
+    async def _aget_relevant_documents(
+        self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        dense = await self.vectorstore.asimilarity_search(query, k=self.fetch_k)
+        return self._fuse(query, dense)
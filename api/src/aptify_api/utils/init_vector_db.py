@@ -1,66 +1,497 @@
 """Embedding functions for vector storage and retrieval."""
 
+import hashlib
+import json
 import os
+import threading
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 
-embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+from .embedding_cache import CachedEmbeddings
+from .embedding_pipeline import PipelineConfig, SourceChunks, run_pipeline
+from .onnx_embeddings import ONNX_FILES, OnnxEmbeddings
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# Chunk embeddings are cached on disk so rebuilds only embed new text.
+EMBED_CACHE_DIR = os.getenv("EMBED_CACHE_DIR", "src/aptify_api/db/embedding_cache")
+_embeddings: Optional[Embeddings] = None
+_embeddings_lock = threading.Lock()
 
 # from langchain_openai import OpenAIEmbeddings
 
 DIRECTORY_PATH = os.getenv("DOCS_PATH", "./documents")
-# 2. Initialize the DirectoryLoader
-# glob="**/*.pdf" ensures we get PDFs even in subfolders of api/documents
-loader = DirectoryLoader(
-    DIRECTORY_PATH,
-    glob="**/*.pdf",
-    loader_cls=PyPDFLoader,  # Use PyPDFLoader (or PyMuPDFLoader) for parsing
-    show_progress=True,  # Shows a progress bar (useful for many files)
-    use_multithreading=True,  # Speeds up loading significantly
-)
+PERSIST_DIRECTORY = os.getenv("CHROMA_PATH", "src/aptify_api/db/chroma")
+# Collection of the default torch backend; other backends get their own
+# collection (see collection_name()) since their vectors are not comparable.
+COLLECTION_NAME = "rag-chroma"
+MANIFEST_VERSION = 1
 
-docs = loader.load()
-print(f"Loaded {len(docs)} documents from PDFs.")
+# Bumped whenever this process changes the collection; see vectorstore_version().
+_store_generation = 0
+# Called with (removed chunk ids, upserted chunks) after every collection write
+# so in-process mirrors such as the BM25 index stay in step with Chroma.
+ChangeListener = Callable[[List[str], List[Document]], None]
+_change_listeners: List[ChangeListener] = []
 
-text_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=1000,  # Target size of chunk
-    chunk_overlap=200,  # Overlap ensures context across boundaries
-    separators=["\n\n", "\n", " ", ""],  # Priority order
-)
 
-doc_splits = text_splitter.split_documents(docs)
+def _build_embedding_model(backend: str) -> Embeddings:
+    config = PipelineConfig.from_env()
+    if backend == "torch":
+        return HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL,
+            encode_kwargs={"batch_size": config.batch_size},
+        )
+    if backend in ONNX_FILES:
+        return OnnxEmbeddings(
+            EMBEDDING_MODEL,
+            backend=backend,
+            file_name=os.getenv("EMBEDDING_ONNX_FILE"),
+            batch_size=config.batch_size,
+            num_threads=config.num_threads,
+        )
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}")
 
 
-def initialize_vectorstore(documents=None):
-    persist_directory = "src/aptify_api/db/chroma"
+def embedding_backend() -> str:
+    return os.getenv("EMBEDDING_BACKEND", "torch")
 
-    # Default to the module-level splits computed above so callers can simply
-    # run initialize_vectorstore() without needing to pass anything in.
-    if documents is None:
-        documents = doc_splits
 
-    if not os.path.exists(persist_directory):
-        print("Chroma DB does not exist. Creating a new database...")
-        # Initialize Chroma from documents and save it to the directory
-        vectorstore = Chroma.from_documents(
-            documents=documents,
-            collection_name="rag-chroma",
-            embedding=embeddings,
-            persist_directory=persist_directory,
+def embedding_key(backend: Optional[str] = None) -> str:
+    """Identify the vectors a backend produces (model plus runtime)."""
+
+    backend = backend or embedding_backend()
+    return EMBEDDING_MODEL if backend == "torch" else f"{EMBEDDING_MODEL}@{backend}"
+
+
+def collection_name(backend: Optional[str] = None) -> str:
+    """Chroma collection holding the vectors of ``backend``."""
+
+    backend = backend or embedding_backend()
+    return COLLECTION_NAME if backend == "torch" else f"{COLLECTION_NAME}-{backend}"
+
+
+def manifest_path() -> str:
+    """Where the sync manifest of the current backend's collection lives.
+
+    Per-file content hashes and chunk ids live next to the Chroma directory
+    so a sync can tell which PDFs were added, edited or removed since last
+    time. ``CHROMA_MANIFEST_PATH`` overrides the location.
+    """
+
+    override = os.getenv("CHROMA_MANIFEST_PATH")
+    if override:
+        return override
+    collection = collection_name()
+    suffix = "" if collection == COLLECTION_NAME else f".{collection}"
+    return f"{PERSIST_DIRECTORY.rstrip('/')}{suffix}.manifest.json"
+
+
+def get_embeddings() -> Embeddings:
+    """Return the process-wide embedding model, loading it on first use.
+
+    ``EMBEDDING_BACKEND`` selects ``torch`` (default), ``onnx`` or
+    ``onnx-int8``. Unless ``EMBED_CACHE=0``, the model is wrapped in
+    ``CachedEmbeddings``, keyed per backend because their vectors differ.
+    """
+
+    global _embeddings
+    if _embeddings is None:
+        with _embeddings_lock:
+            if _embeddings is None:
+                backend = embedding_backend()
+                model = _build_embedding_model(backend)
+                if os.getenv("EMBED_CACHE", "1") == "1":
+                    model = CachedEmbeddings.for_model(
+                        model, embedding_key(backend), EMBED_CACHE_DIR
+                    )
+                _embeddings = model
+    return _embeddings
+
+
+def load_documents(directory_path: str = DIRECTORY_PATH) -> List[Document]:
+    """Parse every PDF under ``directory_path`` into page documents."""
+
+    # glob="**/*.pdf" ensures we get PDFs even in subfolders of api/documents
+    loader = DirectoryLoader(
+        directory_path,
+        glob="**/*.pdf",
+        loader_cls=PyPDFLoader,  # Use PyPDFLoader (or PyMuPDFLoader) for parsing
+        show_progress=True,  # Shows a progress bar (useful for many files)
+        use_multithreading=True,  # Speeds up loading significantly
+    )
+    docs = loader.load()
+    print(f"Loaded {len(docs)} documents from PDFs.")
+    return docs
+
+
+def split_documents(docs: List[Document]) -> List[Document]:
+    """Chunk page documents for embedding."""
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,  # Target size of chunk
+        chunk_overlap=200,  # Overlap ensures context across boundaries
+        separators=["\n\n", "\n", " ", ""],  # Priority order
+    )
+    return text_splitter.split_documents(docs)
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of a file's bytes."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_corpus(directory_path: str = DIRECTORY_PATH) -> Dict[str, str]:
+    """Map each PDF path under ``directory_path`` to its content hash."""
+
+    return {
+        str(path): file_digest(path)
+        for path in sorted(Path(directory_path).glob("**/*.pdf"))
+        if path.is_file()
+    }
+
+
+def load_manifest(path: Optional[str] = None) -> Dict[str, dict]:
+    """Return the per-file manifest, or an empty one if it is missing or stale.
+
+    A manifest written for another collection or embedding model is stale:
+    every file is then re-embedded with the current backend.
+    """
+
+    try:
+        with open(path or manifest_path(), "r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if (
+        manifest.get("version") != MANIFEST_VERSION
+        or manifest.get("collection") != collection_name()
+        # Manifests from before the key was recorded were all torch-built.
+        or manifest.get("embedding", EMBEDDING_MODEL) != embedding_key()
+    ):
+        return {}
+    return manifest.get("files", {})
+
+
+def save_manifest(files: Dict[str, dict], path: Optional[str] = None) -> None:
+    """Atomically write the manifest so a crash never leaves it half written."""
+
+    path = path or manifest_path()
+    payload = {
+        "version": MANIFEST_VERSION,
+        "collection": collection_name(),
+        "embedding": embedding_key(),
+        "files": files,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(payload, handle, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def add_change_listener(listener: ChangeListener) -> None:
+    """Register ``listener`` for every chunk upsert or delete in this process."""
+
+    _change_listeners.append(listener)
+
+
+def _notify_change(removed: List[str], added: List[Document]) -> None:
+    global _store_generation
+    _store_generation += 1
+    for listener in _change_listeners:
+        listener(removed, added)
+
+
+def _notify_upsert(ids: List[str], documents: List[Document]) -> None:
+    _notify_change(
+        [],
+        [
+            Document(id=chunk_id, page_content=doc.page_content, metadata=doc.metadata)
+            for chunk_id, doc in zip(ids, documents)
+        ],
+    )
+
+
+def vectorstore_version() -> tuple:
+    """Identify the current contents of the store for cache invalidation.
+
+    Combines an in-process change counter with the manifest's mtime so that
+    rebuilds run from another process (e.g. the CLI) are noticed as well.
+    """
+
+    try:
+        manifest_mtime = os.stat(manifest_path()).st_mtime_ns
+    except FileNotFoundError:
+        manifest_mtime = None
+    return (_store_generation, manifest_mtime)
+
+
+def chroma_collection(vectorstore: Chroma) -> Any:
+    """Return the chromadb collection behind a LangChain ``Chroma`` store.
+
+    LangChain has no public accessor, so this is the one place that reaches
+    into ``_collection``.
+    """
+
+    return vectorstore._collection
+
+
+def upsert_embedded(
+    vectorstore: Chroma,
+    ids: List[str],
+    vectors: List[List[float]],
+    documents: List[Document],
+) -> None:
+    """Write already-embedded chunks, skipping LangChain's re-embedding path."""
+
+    chroma_collection(vectorstore).upsert(
+        ids=ids,
+        embeddings=vectors,
+        documents=[document.page_content for document in documents],
+        metadatas=[document.metadata for document in documents],
+    )
+
+
+def _chunk_ids(source: str, digest: str, count: int) -> List[str]:
+    return [f"{source}#{digest[:16]}#{index}" for index in range(count)]
+
+
+def _delete_chunks(vectorstore: Chroma, ids: List[str]) -> None:
+    # Chroma rejects an empty id list, which a file without text produces.
+    if ids:
+        vectorstore.delete(ids=ids)
+        _notify_change(ids, [])
+
+
+def source_chunks(
+    source: str, documents: List[Document]
+) -> Tuple[List[str], List[Document]]:
+    """Split ``documents`` and return the chunk ids they are stored under."""
+
+    splits = split_documents(documents)
+    digest = hashlib.sha256(
+        "\0".join(split.page_content for split in splits).encode("utf-8")
+    ).hexdigest()
+    return _chunk_ids(source, digest, len(splits)), splits
+
+
+def stored_chunk_ids(
+    vectorstore: Chroma, prefix: str, page_size: int = 5000
+) -> List[str]:
+    """Return the ids of every stored chunk whose source starts with ``prefix``.
+
+    Chroma metadata filters have no prefix match, but chunk ids start with
+    their source, so the ids alone are paged through.
+    """
+
+    matched: List[str] = []
+    offset = 0
+    while True:
+        ids = vectorstore.get(include=[], limit=page_size, offset=offset)["ids"]
+        matched.extend(chunk_id for chunk_id in ids if chunk_id.startswith(prefix))
+        if len(ids) < page_size:
+            return matched
+        offset += page_size
+
+
+def replace_source(
+    vectorstore: Chroma,
+    source: str,
+    documents: List[Document],
+    config: Optional[PipelineConfig] = None,
+) -> List[str]:
+    """Split and embed ``documents`` as the only chunks stored under ``source``.
+
+    Chunk ids include a hash of the text, so the previous chunks can be
+    deleted after the new ones are written and the source never drops out of
+    retrieval mid-update; re-sending identical text rewrites the same ids.
+    """
+
+    ids, splits = source_chunks(source, documents)
+    stale = vectorstore.get(where={"source": source}, include=[])["ids"]
+    if splits:
+        run_pipeline(
+            partial(upsert_embedded, vectorstore),
+            vectorstore.embeddings,
+            [(source, ids, splits)],
+            config,
+            on_batch=_notify_upsert,
         )
-    else:
-        print("Chroma DB exists. Loading from the existing database...")
-        # Load the existing Chroma database
+    _delete_chunks(vectorstore, sorted(set(stale) - set(ids)))
+    return ids
+
+
+def delete_source(vectorstore: Chroma, source: str) -> None:
+    """Drop every chunk stored under ``source``."""
+
+    stale = vectorstore.get(where={"source": source}, include=[])
+    _delete_chunks(vectorstore, stale["ids"])
+
+
+def sync_vectorstore(
+    vectorstore: Chroma,
+    directory_path: str = DIRECTORY_PATH,
+    manifest_path: Optional[str] = None,
+    config: Optional[PipelineConfig] = None,
+) -> Dict[str, int]:
+    """Bring ``vectorstore`` in line with the PDFs under ``directory_path``.
+
+    Only new or edited files are parsed and embedded. An edited file's old
+    chunks are removed only after its new ones are written, so it stays
+    retrievable throughout and an interrupted sync never loses it; chunks of
+    deleted files are removed up front. Embedding goes through the batched
+    pipeline in ``embedding_pipeline``. Returns per-category file counts.
+    """
+
+    manifest = load_manifest(manifest_path)
+    corpus = scan_corpus(directory_path)
+    summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    for source in sorted(set(manifest) - set(corpus)):
+        _delete_chunks(vectorstore, manifest.pop(source)["chunk_ids"])
+        summary["removed"] += 1
+
+    changed = []
+    for source, digest in corpus.items():
+        entry = manifest.get(source)
+        if entry is not None and entry["sha256"] == digest:
+            summary["unchanged"] += 1
+            continue
+        summary["updated" if entry is not None else "added"] += 1
+        changed.append((source, digest))
+
+    def parse_changed() -> Iterator[SourceChunks]:
+        for source, digest in changed:
+            splits = split_documents(PyPDFLoader(source).load())
+            yield source, _chunk_ids(source, digest, len(splits)), splits
+
+    def checkpoint(source: str, ids: List[str]) -> None:
+        # The new chunks are written by now, so the old ones can go without
+        # the file dropping out of retrieval. Looking them up by source also
+        # catches random ids from stores built before the manifest existed.
+        stale = vectorstore.get(where={"source": source}, include=[])["ids"]
+        _delete_chunks(vectorstore, sorted(set(stale) - set(ids)))
+        manifest[source] = {"sha256": corpus[source], "chunk_ids": ids}
+        # Persist after every file so an interrupted sync resumes cheaply.
+        save_manifest(manifest, manifest_path)
+
+    if changed:
+        run_pipeline(
+            partial(upsert_embedded, vectorstore),
+            vectorstore.embeddings,
+            parse_changed(),
+            config,
+            on_file_done=checkpoint,
+            on_batch=_notify_upsert,
+        )
+
+    save_manifest(manifest, manifest_path)
+    print(
+        "Chroma sync: {added} added, {updated} updated, {removed} removed, "
+        "{unchanged} unchanged.".format(**summary)
+    )
+    return summary
+
+
+def open_vectorstore(documents=None, sync=None, config=None) -> Chroma:
+    """Open the Chroma store, building or syncing it from ``DOCS_PATH``.
+
+    ``sync`` defaults to the ``CHROMA_SYNC`` environment flag; a missing
+    store, or an empty collection for the current embedding backend, is
+    always built through the sync path so it gets a manifest.
+    ``config`` tunes the embedding pipeline used by builds and syncs.
+    """
+
+    persist_directory = PERSIST_DIRECTORY
+    embeddings = get_embeddings()
+    if sync is None:
+        sync = os.getenv("CHROMA_SYNC", "0") == "1"
+
+    if documents is not None and not os.path.exists(persist_directory):
+        print("Chroma DB does not exist. Creating a new database...")
         vectorstore = Chroma(
             persist_directory=persist_directory,
             embedding_function=embeddings,
-            collection_name="rag-chroma",
+            collection_name=collection_name(),
+        )
+        ids = [str(uuid4()) for _ in documents]
+        run_pipeline(
+            partial(upsert_embedded, vectorstore),
+            embeddings,
+            [("documents", ids, list(documents))],
+            config,
+            on_batch=_notify_upsert,
         )
+        return vectorstore
+
+    if not os.path.exists(persist_directory):
+        print("Chroma DB does not exist. Creating a new database...")
+        sync = True
+    else:
+        print("Chroma DB exists. Loading from the existing database...")
+    # Load (or create) the persistent Chroma database
+    vectorstore = Chroma(
+        persist_directory=persist_directory,
+        embedding_function=embeddings,
+        collection_name=collection_name(),
+    )
+    if not sync and chroma_collection(vectorstore).count() == 0:
+        # First start with this embedding backend: its collection is empty.
+        print(f"Collection {collection_name()} is empty. Building it...")
+        sync = True
+    if sync:
+        sync_vectorstore(vectorstore, config=config)
+    return vectorstore
+
 
-    return vectorstore.as_retriever()
+def initialize_vectorstore(documents=None, sync=None, config=None):
+    """Open (building or syncing as needed) the store and return a retriever.
+
+    Each call opens a new Chroma client; long-lived processes should use
+    ``utils.registry.RESOURCES`` so the store is opened once.
+    """
+
+    return open_vectorstore(documents, sync, config).as_retriever()
 
 
 if __name__ == "__main__":
-    initialize_vectorstore()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or refresh the Chroma store.")
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Embed new or changed PDFs and drop chunks of removed ones.",
+    )
+    defaults = PipelineConfig.from_env()
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--threads", type=int, default=defaults.num_threads)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=defaults.num_workers,
+        help="Embed in this many worker processes (0 keeps it in-process).",
+    )
+    args = parser.parse_args()
+    initialize_vectorstore(
+        sync=args.sync,
+        config=PipelineConfig(
+            batch_size=args.batch_size,
+            num_threads=args.threads,
+            num_workers=args.workers,
+            prefetch_files=defaults.prefetch_files,
+        ),
+    )
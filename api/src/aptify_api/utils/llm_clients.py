@@ -0,0 +1,112 @@
+"""Shared, pooled Ollama chat clients for the RAG chains."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LLMClientConfig:
+    """Connection and residency settings shared by every chat client."""
+
+    base_url: Optional[str] = None
+    # How long Ollama keeps a model loaded after a request ("-1" = forever).
+    keep_alive: str = "30m"
+    max_connections: int = 16
+    timeout_seconds: float = 120.0
+    temperature: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> "LLMClientConfig":
+        return cls(
+            base_url=os.getenv("OLLAMA_BASE_URL") or None,
+            keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+            max_connections=int(os.getenv("OLLAMA_MAX_CONNECTIONS", "16")),
+            timeout_seconds=float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "120")),
+        )
+
+
+class LLMClientFactory:
+    """Hand out one ``ChatOllama`` per model name for the whole process.
+
+    Every chain asking for the same model gets the same client, so they share
+    its keep-alive HTTP connection pools (sync and async). ``warm_up`` loads
+    each model into Ollama memory before the first query arrives.
+    """
+
+    def __init__(self, config: Optional[LLMClientConfig] = None) -> None:
+        # Read lazily so a .env loaded after import still applies.
+        self._config = config
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> LLMClientConfig:
+        if self._config is None:
+            self._config = LLMClientConfig.from_env()
+        return self._config
+
+    def get(self, model: str) -> Any:
+        client = self._clients.get(model)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(model)
+                if client is None:
+                    client = self._build(model)
+                    self._clients[model] = client
+        return client
+
+    def _build(self, model: str) -> Any:
+        import httpx
+        from langchain_ollama import ChatOllama
+
+        config = self.config
+        limits = httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_connections,
+        )
+        kwargs: Dict[str, Any] = {}
+        if config.base_url:
+            kwargs["base_url"] = config.base_url
+        return ChatOllama(
+            model=model,
+            temperature=config.temperature,
+            keep_alive=config.keep_alive,
+            client_kwargs={"limits": limits, "timeout": config.timeout_seconds},
+            **kwargs,
+        )
+
+    async def warm_up(self) -> Dict[str, Optional[float]]:
+        """Load every client's model and open a connection; return seconds per model.
+
+        A one-token request makes Ollama load the weights and leaves a pooled
+        connection behind. Failures are logged, not raised, so the API still
+        starts while Ollama is down (``None`` marks those models).
+        """
+
+        async def warm(model: str, client: Any) -> Optional[float]:
+            started = time.perf_counter()
+            try:
+                await client.ainvoke("ping", options={"num_predict": 1})
+            except Exception as exc:
+                logger.warning("Warm-up of %s failed: %s", model, exc)
+                return None
+            return time.perf_counter() - started
+
+        with self._lock:
+            clients = dict(self._clients)
+        timings = await asyncio.gather(
+            *(warm(model, client) for model, client in clients.items())
+        )
+        return dict(zip(clients, timings))
+
+
+LLM_CLIENTS = LLMClientFactory()
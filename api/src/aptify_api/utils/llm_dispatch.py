@@ -0,0 +1,186 @@
+"""Cross-request micro-batching of LLM calls."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+
+_STOP = object()
+
+
+@dataclass
+class _Call:
+    group: str
+    prompt: Any
+    config: Optional[RunnableConfig]
+    context: contextvars.Context
+    queued_at: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class LLMDispatcher:
+    """Collect LLM calls from concurrent requests and send them together.
+
+    Chains use ``dispatcher.route(name)`` in place of the LLM; calls that
+    arrive within ``window_ms`` of each other are grouped by route (one route
+    per prompt template). A group goes out as a single ``llm.batch`` when the
+    backend batches natively (``native_batch``); otherwise its calls run
+    individually on a pool of ``max_concurrency`` workers, which also bounds
+    how many requests one process keeps open against the LLM server (Ollama
+    serves ``OLLAMA_NUM_PARALLEL`` at a time and queues the rest).
+
+    Each call keeps its own ``config``, so callbacks and tracing still see
+    one LLM run per call.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        window_ms: float = 5.0,
+        max_batch: int = 16,
+        max_concurrency: int = 4,
+        native_batch: bool = False,
+    ) -> None:
+        self.llm = llm
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self.max_concurrency = max_concurrency
+        self.native_batch = native_batch
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="llm-dispatch"
+        )
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.calls = 0
+        self.batches = 0
+        self.queue_seconds = 0.0
+
+    @classmethod
+    def from_env(cls, llm: Any) -> "LLMDispatcher":
+        return cls(
+            llm,
+            window_ms=float(os.getenv("LLM_DISPATCH_WINDOW_MS", "5")),
+            max_batch=int(os.getenv("LLM_DISPATCH_MAX_BATCH", "16")),
+            max_concurrency=int(os.getenv("LLM_DISPATCH_CONCURRENCY", "4")),
+            native_batch=os.getenv("LLM_DISPATCH_NATIVE_BATCH", "0") == "1",
+        )
+
+    def route(self, name: str) -> RunnableLambda:
+        """Runnable standing in for the LLM in the chain for one prompt template."""
+
+        def call(prompt: Any, config: RunnableConfig) -> Any:
+            return self.submit(name, prompt, config).result()
+
+        async def acall(prompt: Any, config: RunnableConfig) -> Any:
+            return await asyncio.wrap_future(self.submit(name, prompt, config))
+
+        return RunnableLambda(call, afunc=acall, name=f"dispatch.{name}")
+
+    def submit(
+        self, group: str, prompt: Any, config: Optional[RunnableConfig] = None
+    ) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._collect, name="llm-dispatcher", daemon=True
+                )
+                self._thread.start()
+        call = _Call(group, prompt, config, contextvars.copy_context())
+        self._queue.put(call)
+        return call.future
+
+    def _collect(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            pending: List[_Call] = [first]
+            deadline = time.perf_counter() + self.window_ms / 1000
+            stopping = False
+            while len(pending) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+            self._dispatch(pending)
+            if stopping:
+                return
+
+    def _dispatch(self, pending: List[_Call]) -> None:
+        groups: Dict[str, List[_Call]] = defaultdict(list)
+        for call in pending:
+            groups[call.group].append(call)
+        now = time.perf_counter()
+        with self._lock:
+            self.calls += len(pending)
+            self.batches += len(groups)
+            self.queue_seconds += sum(now - call.queued_at for call in pending)
+        for calls in groups.values():
+            if self.native_batch and len(calls) > 1:
+                self._pool.submit(self._run_batch, calls)
+            else:
+                for call in calls:
+                    self._pool.submit(self._run_one, call)
+
+    def _run_one(self, call: _Call) -> None:
+        if not call.future.set_running_or_notify_cancel():
+            return
+        try:
+            result = call.context.run(self.llm.invoke, call.prompt, call.config)
+        except BaseException as exc:  # handed to the waiting caller
+            call.future.set_exception(exc)
+        else:
+            call.future.set_result(result)
+
+    def _run_batch(self, calls: List[_Call]) -> None:
+        calls = [call for call in calls if call.future.set_running_or_notify_cancel()]
+        if not calls:
+            return
+        try:
+            results = self.llm.batch(
+                [call.prompt for call in calls],
+                [call.config or {} for call in calls],
+                return_exceptions=True,
+            )
+        except BaseException as exc:
+            results = [exc] * len(calls)
+        for call, result in zip(calls, results):
+            if isinstance(result, BaseException):
+                call.future.set_exception(result)
+            else:
+                call.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "batches": self.batches,
+                "mean_batch_size": self.calls / self.batches if self.batches else 0.0,
+                "mean_queue_ms": 1000 * self.queue_seconds / self.calls if self.calls else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,94 @@
+"""ONNX Runtime embedding backend for CPU-only nodes."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+ONNX_FILES = {
+    "onnx": "onnx/model.onnx",
+    # Dynamic uint8 quantisation that only needs AVX2.
+    "onnx-int8": "onnx/model_quint8_avx2.onnx",
+}
+
+
+class OnnxEmbeddings(Embeddings):
+    """Sentence-transformers model exported to ONNX, run without torch.
+
+    Reproduces the all-MiniLM-L6-v2 sentence-transformers pipeline: wordpiece
+    tokenisation truncated to ``max_length``, mean pooling over the attention
+    mask and L2 normalisation. Needs ``onnxruntime`` (``pip install
+    aptify-api[onnx]``); the tokenizer and graph come from the Hugging Face hub.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        backend: str = "onnx",
+        file_name: Optional[str] = None,
+        batch_size: int = 64,
+        num_threads: Optional[int] = None,
+        max_length: int = 256,
+    ) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImportError(
+                "The ONNX embedding backend needs onnxruntime: "
+                "pip install 'aptify-api[onnx]'"
+            ) from exc
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self.model_id = model_id
+        self.backend = backend
+        self.batch_size = batch_size
+        self.file_name = file_name or ONNX_FILES[backend]
+
+        tokenizer_path = hf_hub_download(model_id, "tokenizer.json")
+        self._tokenizer = Tokenizer.from_file(tokenizer_path)
+        self._tokenizer.enable_truncation(max_length=max_length)
+        self._tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self._session = ort.InferenceSession(
+            hf_hub_download(model_id, self.file_name),
+            options,
+            providers=["CPUExecutionProvider"],
+        )
+        self._input_names = {item.name for item in self._session.get_inputs()}
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batches = []
+        for start in range(0, len(texts), self.batch_size):
+            chunk = texts[start : start + self.batch_size]
+            encodings = self._tokenizer.encode_batch(chunk)
+            mask = np.array([item.attention_mask for item in encodings], dtype=np.int64)
+            feeds = {
+                "input_ids": np.array([item.ids for item in encodings], dtype=np.int64),
+                "attention_mask": mask,
+            }
+            if "token_type_ids" in self._input_names:
+                feeds["token_type_ids"] = np.array(
+                    [item.type_ids for item in encodings], dtype=np.int64
+                )
+            hidden = self._session.run(None, feeds)[0]
+            weights = mask[..., None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.clip(
+                weights.sum(axis=1), 1e-9, None
+            )
+            norms = np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled / norms)
+        if not batches:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(batches)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._encode(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._encode([text])[0].tolist()
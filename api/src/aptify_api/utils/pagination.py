@@ -0,0 +1,73 @@
+"""Cursor pagination parameters and response envelope shared by list endpoints."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Generic, List, Literal, Mapping, Optional, Sequence, TypeVar
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, Field
+
+from ..storage.pagination import DEFAULT_SORT
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+SORTABLE = ("created_at", "updated_at", "id")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to fetch the next page; null on the last page"
+    )
+
+
+@dataclass
+class PageQuery:
+    cursor: Optional[str]
+    limit: int
+    sort: str
+    order: str
+
+
+def page_query(
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    sort: str = Query(DEFAULT_SORT, description="Field to order by (ties broken by id)"),
+    order: Literal["asc", "desc"] = Query("asc"),
+) -> PageQuery:
+    """FastAPI dependency collecting the paging query parameters."""
+    return PageQuery(cursor=cursor, limit=limit, sort=sort, order=order)
+
+
+def fetch_page(
+    source: Any,
+    query: PageQuery,
+    criteria: Optional[Mapping[str, Any]] = None,
+    sortable: Sequence[str] = SORTABLE,
+    key: Optional[str] = None,
+) -> Page:
+    """Read one page from a repository (or, with ``key``, one group of a record log).
+
+    Works against any storage backend: the backend applies the filters and
+    the cursor, so only ``limit`` records are loaded and validated.
+    """
+    if query.sort not in sortable:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by {query.sort!r}; choose one of {', '.join(sortable)}",
+        )
+    args = (criteria or {},) if key is None else (key, criteria or {})
+    try:
+        page = source.page(
+            *args,
+            sort=query.sort,
+            descending=query.order == "desc",
+            after=query.cursor,
+            limit=query.limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return Page(items=page.items, next_cursor=page.next_cursor)
@@ -2,11 +2,37 @@
 
 from __future__ import annotations
 
-from pprint import pprint
-from typing import Any, Dict, List
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import wait
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from langchain_core.documents import Document
-from typing_extensions import TypedDict
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor, patch_config
+from langgraph.types import Send
+from typing_extensions import NotRequired, TypedDict
+
+from .context_packer import pack_context
+from .web_search import WebSearch, results_document
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ANSWER = "I don't know."
+GENERATION_GRADING_MODES = ("sequential", "concurrent", "combined")
 
 
 class GraphState(TypedDict):
@@ -15,23 +41,236 @@ class GraphState(TypedDict):
     question: str
     generation: str
     documents: Any
+    # Packed prompt context of the documents the generation was based on.
+    context: NotRequired[str]
+    # Loop counters and budget bookkeeping, see RagBudget.
+    rewrites: NotRequired[int]
+    generations: NotRequired[int]
+    # Drafts rejected as ungrounded; only these use up max_regenerations.
+    regenerations: NotRequired[int]
+    deadline: NotRequired[Optional[float]]
+    degraded: NotRequired[bool]
+    degraded_reason: NotRequired[Optional[str]]
+    # Set when the grounding grader rejected the last draft (then discarded).
+    ungrounded: NotRequired[bool]
+
+
+@dataclass
+class RagBudget:
+    """Per-request limits on the corrective-RAG loops."""
+
+    max_rewrites: int = 2
+    max_regenerations: int = 2
+    deadline_seconds: Optional[float] = 60.0
+
+    @classmethod
+    def from_env(cls) -> "RagBudget":
+        deadline = float(os.getenv("RAG_DEADLINE_SECONDS", "60"))
+        return cls(
+            max_rewrites=int(os.getenv("RAG_MAX_REWRITES", "2")),
+            max_regenerations=int(os.getenv("RAG_MAX_REGENERATIONS", "2")),
+            deadline_seconds=deadline if deadline > 0 else None,
+        )
+
+    def initial_state(self, question: str) -> GraphState:
+        """Return a fresh graph input whose deadline starts now."""
+
+        deadline = (
+            time.monotonic() + self.deadline_seconds
+            if self.deadline_seconds is not None
+            else None
+        )
+        return {
+            "question": question,
+            "generation": "",
+            "documents": [],
+            "rewrites": 0,
+            "generations": 0,
+            "regenerations": 0,
+            "deadline": deadline,
+            "degraded": False,
+            "degraded_reason": None,
+            "ungrounded": False,
+        }
+
+
+@dataclass
+class _Call:
+    """One blocking call made by a node, runnable from sync or async code."""
+
+    run: Callable[[], Any]
+    arun: Callable[[Optional[RunnableConfig]], Awaitable[Any]]
+
+
+def _invoke(runnable: Any, value: Any) -> _Call:
+    return _Call(
+        run=lambda: runnable.invoke(value),
+        arun=lambda config: runnable.ainvoke(value, config=config),
+    )
+
+
+def _blocking(func: Callable[..., Any], *args: Any) -> _Call:
+    # CPU-bound work; the async path keeps it off the event loop.
+    return _Call(
+        run=lambda: func(*args),
+        arun=lambda config: asyncio.to_thread(func, *args),
+    )
+
+
+# A node body yields a _Call (or a tuple of calls to run concurrently), is
+# sent back the result(s), and returns the state update or edge label.
+NodeSteps = Generator[Union[_Call, Tuple[_Call, ...]], Any, Any]
+
+
+def _degrade(state: GraphState, reason: str) -> Send:
+    """Route to the ``degrade`` node, telling it which budget ran out."""
+
+    return Send("degrade", {**state, "degraded_reason": reason})
+
+
+class DeadlineExceeded(TimeoutError):
+    """A node call would outlive the request deadline."""
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded()
+    return remaining
+
+
+def _run_calls(
+    pool: ContextThreadPoolExecutor,
+    calls: Tuple[_Call, ...],
+    deadline: Optional[float],
+) -> List[Any]:
+    timeout = _remaining(deadline)
+    if timeout is None and len(calls) == 1:
+        return [calls[0].run()]
+    futures = [pool.submit(call.run) for call in calls]
+    _, pending = wait(futures, timeout=timeout)
+    if pending:
+        # Calls already running finish in the background; nobody waits on them.
+        for future in pending:
+            future.cancel()
+        raise DeadlineExceeded()
+    return [future.result() for future in futures]
+
+
+async def _arun_calls(
+    calls: Tuple[_Call, ...],
+    config: Optional[RunnableConfig],
+    deadline: Optional[float],
+) -> List[Any]:
+    timeout = _remaining(deadline)
+    gathered = asyncio.gather(*(call.arun(config) for call in calls))
+    try:
+        return list(await asyncio.wait_for(gathered, timeout))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded() from None
+
+
+def _drive(
+    steps: NodeSteps, pool: ContextThreadPoolExecutor, deadline: Optional[float]
+) -> Any:
+    """Run a node body to completion, making its calls on ``pool``."""
+
+    result = None
+    while True:
+        try:
+            step = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        calls = step if isinstance(step, tuple) else (step,)
+        results = _run_calls(pool, calls, deadline)
+        result = tuple(results) if isinstance(step, tuple) else results[0]
+
+
+async def _adrive(
+    steps: NodeSteps, config: Optional[RunnableConfig], deadline: Optional[float]
+) -> Any:
+    """Run a node body to completion, awaiting its calls."""
+
+    result = None
+    while True:
+        try:
+            step = steps.send(result)
+        except StopIteration as done:
+            return done.value
+        calls = step if isinstance(step, tuple) else (step,)
+        results = await _arun_calls(calls, config, deadline)
+        result = tuple(results) if isinstance(step, tuple) else results[0]
+
+
+def _node_pair(
+    steps: Callable[[Any, GraphState], NodeSteps],
+    on_deadline: Callable[[GraphState], Any],
+) -> Tuple[Callable, Callable]:
+    """Derive a sync node handler and its coroutine twin from one node body.
+
+    Every call the body makes is bounded by the time left before the state's
+    deadline; when that runs out the handler returns ``on_deadline(state)``
+    instead, and the graph's next budget check routes to ``degrade``.
+    """
+
+    name = steps.__name__.lstrip("_")
+
+    def timed_out(state: GraphState) -> Any:
+        logger.debug("---DEADLINE EXCEEDED IN %s---", name.upper())
+        return on_deadline(state)
+
+    def node(self: Any, state: GraphState) -> Any:
+        try:
+            return _drive(steps(self, state), self._call_pool, state.get("deadline"))
+        except DeadlineExceeded:
+            return timed_out(state)
+
+    async def anode(
+        self: Any, state: GraphState, config: Optional[RunnableConfig] = None
+    ) -> Any:
+        try:
+            return await _adrive(steps(self, state), config, state.get("deadline"))
+        except DeadlineExceeded:
+            return timed_out(state)
+
+    node.__name__, anode.__name__ = name, f"a{name}"
+    node.__doc__ = anode.__doc__ = steps.__doc__
+    return node, anode
 
 
 class RagGraphNodes:
-    """Stateful wrappers for the graph nodes."""
+    """Stateful wrappers for the graph nodes.
+
+    Each node body is written once, as a generator yielding its LLM and
+    retrieval calls. ``_node_pair`` derives a sync method and an ``a``-prefixed
+    coroutine twin from it, so the same compiled graph serves both ``invoke``
+    and ``ainvoke``/``astream``. The coroutines hand the node ``config`` to the
+    chains, which keeps callbacks (and token streaming) attached on Python 3.10.
+    """
 
     def __init__(
         self,
-        retriever: Any,
+        retriever: Callable[[], Any],
         rag_chain: Any,
         question_router: Any,
         question_rewriter: Any,
         retrieval_grader: Any,
-        web_search_tool: Any,
+        web_search_tool: WebSearch,
         hallucination_grader: Any,
         answer_grader: Any,
+        grading_concurrency: int = 4,
+        budget: Optional[RagBudget] = None,
+        reranker: Optional[Any] = None,
+        web_context_tokens: Optional[int] = 1500,
+        context_tokens: Optional[int] = 3000,
+        generation_grader: Optional[Any] = None,
+        generation_grading: str = "sequential",
+        call_workers: int = 32,
     ) -> None:
-        self.retriever = retriever
+        # Called per query, so the store is only opened when first needed.
+        self._retriever = retriever
         self.rag_chain = rag_chain
         self.question_router = question_router
         self.question_rewriter = question_rewriter
@@ -39,127 +278,302 @@ class RagGraphNodes:
         self.web_search_tool = web_search_tool
         self.hallucination_grader = hallucination_grader
         self.answer_grader = answer_grader
+        # Upper bound on in-flight relevance-grading calls per request.
+        self.grading_concurrency = grading_concurrency
+        self.budget = budget or RagBudget()
+        # When set (see utils.reranker), replaces the per-document LLM grader.
+        self.reranker = reranker
+        # Cap on the joined web results handed to generate and the graders.
+        self.web_context_tokens = web_context_tokens
+        # Budget for the packed context shared by generate and the grounding grader.
+        self.context_tokens = context_tokens
+        # "sequential" (grounding, then usefulness), "concurrent" (both at
+        # once) or "combined" (one call to generation_grader for both).
+        if generation_grading not in GENERATION_GRADING_MODES:
+            raise ValueError(f"Unknown generation grading mode {generation_grading!r}")
+        if generation_grading == "combined" and generation_grader is None:
+            raise ValueError("Combined generation grading needs a generation_grader")
+        self.generation_grader = generation_grader
+        self.generation_grading = generation_grading
+        # Runs the deadline-bounded calls of the sync handlers for every
+        # request, so a node call does not start its own threads.
+        self._call_pool = ContextThreadPoolExecutor(
+            max_workers=call_workers, thread_name_prefix="rag-node"
+        )
+
+    def close(self) -> None:
+        """Stop the worker threads of the sync handlers."""
+
+        self._call_pool.shutdown(wait=False, cancel_futures=True)
 
-    def retrieve(self, state: GraphState) -> Dict[str, Any]:
+    def _retrieve(self, state: GraphState) -> NodeSteps:
         """Retrieve documents from the vectorstore."""
 
-        print("---RETRIEVE---")
+        logger.debug("---RETRIEVE---")
         question = state["question"]
-        documents = self.retriever.invoke(question)
+        documents = yield _invoke(self._retriever(), question)
         return {"documents": documents, "question": question}
 
-    def generate(self, state: GraphState) -> Dict[str, Any]:
+    retrieve, aretrieve = _node_pair(_retrieve, lambda state: {"documents": []})
+
+    def _generate(self, state: GraphState) -> NodeSteps:
         """Generate an answer using the retrieved documents."""
 
-        print("---GENERATE---")
+        logger.debug("---GENERATE---")
         question = state["question"]
 
-        generation = self.rag_chain.invoke(
-            {"documents": state["documents"], "question": question}
+        context = pack_context(state["documents"], self.context_tokens)
+        generation = yield _invoke(
+            self.rag_chain, {"documents": context, "question": question}
         )
         return {
             "documents": state["documents"],
             "question": question,
+            "context": context,
             "generation": generation,
+            "generations": state.get("generations", 0) + 1,
+            "ungrounded": False,
         }
 
-    def grade_documents(self, state: GraphState) -> Dict[str, Any]:
-        """Filter documents that are relevant to the question."""
+    # Without a new draft the grading edge sees the deadline and degrades.
+    generate, agenerate = _node_pair(_generate, lambda state: {})
 
-        print("---CHECK DOCUMENT RELEVANCE TO QUESTION---")
-        question = state["question"]
-        filtered_docs: List[Document] = []
-        for document in state["documents"]:
+    def _grading_inputs(self, state: GraphState) -> List[Dict[str, str]]:
+        return [
+            {"question": state["question"], "documents": document.page_content}
+            for document in state["documents"]
+        ]
 
-            score = self.retrieval_grader.invoke(
-                {"question": question, "documents": document.page_content}
-            )
-            if score["score"] == "yes":
-                print("---GRADE: DOCUMENT RELEVANT---")
+    def _keep_relevant(self, state: GraphState, scores: List[Any]) -> Dict[str, Any]:
+        filtered_docs: List[Document] = []
+        for document, score in zip(state["documents"], scores):
+            if self._yes(score):
+                logger.debug("---GRADE: DOCUMENT RELEVANT---")
                 filtered_docs.append(document)
             else:
-                print("---GRADE: DOCUMENT NOT RELEVANT---")
-        return {"documents": filtered_docs, "question": question}
+                logger.debug("---GRADE: DOCUMENT NOT RELEVANT---")
+        return {"documents": filtered_docs, "question": state["question"]}
 
-    def transform_query(self, state: GraphState) -> Dict[str, Any]:
-        """Re-write the question after filtering out irrelevant documents."""
+    def _rerank(self, state: GraphState) -> Dict[str, Any]:
+        kept = self.reranker.rerank(state["question"], list(state["documents"]))
+        logger.debug("---RERANK: KEPT %d OF %d---", len(kept), len(state["documents"]))
+        return {
+            "documents": [document for document, _ in kept],
+            "question": state["question"],
+        }
 
-        print("---TRANSFORM QUERY---")
-        question = state["question"]
-        documents = state["documents"]
-        better_question = self.question_rewriter.invoke({"question": question})
-        return {"documents": documents, "question": better_question}
+    def _grade_documents(self, state: GraphState) -> NodeSteps:
+        """Filter documents that are relevant to the question."""
 
-    def web_search(self, state: GraphState) -> Dict[str, Any]:
-        """Fetch web search results for the transformed question."""
+        logger.debug("---CHECK DOCUMENT RELEVANCE TO QUESTION---")
+        if self.reranker is not None:
+            return (yield _blocking(self._rerank, state))
+        # Grade every document concurrently; batch() keeps the input order.
+        grader, inputs = self.retrieval_grader, self._grading_inputs(state)
+        limit = self.grading_concurrency
+        scores = yield _Call(
+            run=lambda: grader.batch(inputs, config={"max_concurrency": limit}),
+            arun=lambda config: grader.abatch(
+                inputs, config=patch_config(config, max_concurrency=limit)
+            ),
+        )
+        return self._keep_relevant(state, scores)
 
-        print("---WEB SEARCH---")
-        question = state["question"]
-        docs = self.web_search_tool.invoke({"query": question})
+    grade_documents, agrade_documents = _node_pair(
+        _grade_documents, lambda state: {"documents": []}
+    )
 
-        results = []
-        if isinstance(docs, dict):
-            results = docs.get("results", [])
-        elif isinstance(docs, list):
-            results = docs
+    def _transform_query(self, state: GraphState) -> NodeSteps:
+        """Re-write the question after filtering out irrelevant documents."""
 
-        web_results_list = [
-            item["content"] for item in results if isinstance(item, dict)
-        ]
-        web_results_text = "\n\n".join(web_results_list)
+        logger.debug("---TRANSFORM QUERY---")
+        better_question = yield _invoke(
+            self.question_rewriter, {"question": state["question"]}
+        )
         return {
-            "documents": Document(page_content=web_results_text),
-            "question": question,
+            "documents": state["documents"],
+            "question": better_question,
+            "rewrites": state.get("rewrites", 0) + 1,
         }
 
-    def route_question(self, state: GraphState) -> str:
-        """Decide whether to answer via the vectorstore or a web search."""
+    transform_query, atransform_query = _node_pair(
+        _transform_query,
+        lambda state: {"rewrites": state.get("rewrites", 0) + 1},
+    )
 
-        print("---ROUTE QUESTION---")
+    def _web_search(self, state: GraphState) -> NodeSteps:
+        """Fetch web search results for the transformed question."""
+
+        logger.debug("---WEB SEARCH---")
         question = state["question"]
-        source = self.question_router.invoke({"question": question})
-        print(source)
+        tool = self.web_search_tool
+        results = yield _Call(
+            run=lambda: tool.search(question),
+            arun=lambda config: tool.asearch(question, config=config),
+        )
+        return {
+            "documents": results_document(results, self.web_context_tokens),
+            "question": question,
+        }
 
+    web_search, aweb_search = _node_pair(_web_search, lambda state: {"documents": []})
+
+    @staticmethod
+    def _route(source: Dict[str, Any]) -> str:
+        logger.debug("router output: %s", source)
         if source.get("datasource") == "web_search":
-            print("---ROUTE QUESTION TO WEB SEARCH---")
+            logger.debug("---ROUTE QUESTION TO WEB SEARCH---")
             return "web_search"
-        print("---ROUTE QUESTION TO RAG---")
+        logger.debug("---ROUTE QUESTION TO RAG---")
         return "vectorstore"
 
-    def decide_to_generate(self, state: GraphState) -> str:
+    def _route_question(self, state: GraphState) -> NodeSteps:
+        """Decide whether to answer via the vectorstore or a web search."""
+
+        logger.debug("---ROUTE QUESTION---")
+        source = yield _invoke(self.question_router, {"question": state["question"]})
+        return self._route(source)
+
+    route_question, aroute_question = _node_pair(
+        _route_question, lambda state: "vectorstore"
+    )
+
+    def _context(self, state: GraphState) -> str:
+        if "context" in state:
+            return state["context"]
+        return pack_context(state["documents"], self.context_tokens)
+
+    @staticmethod
+    def _past_deadline(state: GraphState) -> bool:
+        deadline = state.get("deadline")
+        return deadline is not None and time.monotonic() >= deadline
+
+    def _rewrites_exhausted(self, state: GraphState) -> bool:
+        return state.get("rewrites", 0) >= self.budget.max_rewrites
+
+    def _regenerations_exhausted(self, state: GraphState) -> bool:
+        return state.get("regenerations", 0) > self.budget.max_regenerations
+
+    def degrade(self, state: GraphState) -> Dict[str, Any]:
+        """Stop looping and return the best answer produced so far.
+
+        Reached through ``_degrade``, so ``degraded_reason`` is the budget
+        (``deadline``, ``max_rewrites`` or ``max_regenerations``) whose check
+        sent the graph here. A draft the grounding grader rejected is never
+        returned; without a grounded draft the answer is ``FALLBACK_ANSWER``.
+        """
+
+        reason = state["degraded_reason"]
+        logger.debug("---BUDGET EXHAUSTED (%s), RETURNING BEST ANSWER---", reason)
+        generation = "" if state.get("ungrounded") else state.get("generation")
+        return {
+            "generation": generation or FALLBACK_ANSWER,
+            "degraded": True,
+            "degraded_reason": reason,
+        }
+
+    def reject_generation(self, state: GraphState) -> Dict[str, Any]:
+        """Discard a draft that is not grounded in the documents."""
+
+        logger.debug("---DISCARD UNGROUNDED GENERATION---")
+        return {
+            "generation": "",
+            "ungrounded": True,
+            "regenerations": state.get("regenerations", 0) + 1,
+        }
+
+    def decide_to_regenerate(self, state: GraphState) -> Union[str, Send]:
+        """Retry generation after a rejected draft, budget permitting."""
+
+        if self._past_deadline(state):
+            return _degrade(state, "deadline")
+        if self._regenerations_exhausted(state):
+            return _degrade(state, "max_regenerations")
+        logger.debug("---DECISION: GENERATION IS NOT GROUNDED IN DOCUMENTS, RE-TRY---")
+        return "generate"
+
+    def decide_to_generate(self, state: GraphState) -> Union[str, Send]:
         """Determine whether the filtered documents were relevant enough."""
 
-        print("---ASSESS GRADED DOCUMENTS---")
+        logger.debug("---ASSESS GRADED DOCUMENTS---")
         if not state["documents"]:
-            print(
+            if self._past_deadline(state):
+                return _degrade(state, "deadline")
+            if self._rewrites_exhausted(state):
+                return _degrade(state, "max_rewrites")
+            logger.debug(
                 "---DECISION: ALL DOCUMENTS ARE NOT RELEVANT TO QUESTION, TRANSFORM QUERY---"
             )
             return "transform_query"
-        print("---DECISION: GENERATE---")
+        logger.debug("---DECISION: GENERATE---")
         return "generate"
 
-    def grade_generation_v_documents_and_question(self, state: GraphState) -> str:
-        """Check whether the generation is grounded and useful."""
+    def _grounding_input(self, state: GraphState) -> Dict[str, str]:
+        return {"documents": self._context(state), "generation": state["generation"]}
 
-        print("---CHECK HALLUCINATIONS---")
-        question = state["question"]
-        documents = state["documents"]
-        generation = state["generation"]
+    def _usefulness_input(self, state: GraphState) -> Dict[str, str]:
+        return {"question": state["question"], "generation": state["generation"]}
 
-        score = self.hallucination_grader.invoke(
-            {"documents": documents, "generation": generation}
-        )
-        if score["score"] != "yes":
-            pprint("---DECISION: GENERATION IS NOT GROUNDED IN DOCUMENTS, RE-TRY---")
-            return "not supported"
+    @staticmethod
+    def _yes(score: Dict[str, Any], key: str = "score") -> bool:
+        return str(score.get(key, "")).strip().lower() == "yes"
 
-        print("---DECISION: GENERATION IS GROUNDED IN DOCUMENTS---")
-        print("---GRADE GENERATION vs QUESTION---")
-        score = self.answer_grader.invoke(
-            {"question": question, "generation": generation}
-        )
-        if score["score"] == "yes":
-            print("---DECISION: GENERATION ADDRESSES QUESTION---")
+    def _generation_verdict(
+        self, state: GraphState, grounded: bool, useful: Optional[bool]
+    ) -> Union[str, Send]:
+        """Map the two grader verdicts onto the conditional-edge labels."""
+
+        if not grounded:
+            return "not supported"
+        logger.debug("---DECISION: GENERATION IS GROUNDED IN DOCUMENTS---")
+        if useful:
+            logger.debug("---DECISION: GENERATION ADDRESSES QUESTION---")
             return "useful"
-        print("---DECISION: GENERATION DOES NOT ADDRESS QUESTION---")
+        if self._past_deadline(state):
+            return _degrade(state, "deadline")
+        if self._rewrites_exhausted(state):
+            return _degrade(state, "max_rewrites")
+        logger.debug("---DECISION: GENERATION DOES NOT ADDRESS QUESTION---")
         return "not useful"
+
+    def _grade_generation_v_documents_and_question(
+        self, state: GraphState
+    ) -> NodeSteps:
+        """Check whether the generation is grounded and useful."""
+
+        if self._past_deadline(state):
+            return _degrade(state, "deadline")
+        if self.generation_grading == "combined":
+            logger.debug("---GRADE GENERATION (COMBINED)---")
+            score = yield _invoke(
+                self.generation_grader,
+                {**self._grounding_input(state), "question": state["question"]},
+            )
+            return self._generation_verdict(
+                state, self._yes(score, "grounded"), self._yes(score, "useful")
+            )
+        if self.generation_grading == "concurrent":
+            logger.debug("---GRADE GENERATION (CONCURRENT)---")
+            grounded, useful = yield (
+                _invoke(self.hallucination_grader, self._grounding_input(state)),
+                _invoke(self.answer_grader, self._usefulness_input(state)),
+            )
+            return self._generation_verdict(
+                state, self._yes(grounded), self._yes(useful)
+            )
+
+        logger.debug("---CHECK HALLUCINATIONS---")
+        score = yield _invoke(self.hallucination_grader, self._grounding_input(state))
+        if not self._yes(score):
+            return self._generation_verdict(state, False, None)
+        logger.debug("---GRADE GENERATION vs QUESTION---")
+        score = yield _invoke(self.answer_grader, self._usefulness_input(state))
+        return self._generation_verdict(state, True, self._yes(score))
+
+    (
+        grade_generation_v_documents_and_question,
+        agrade_generation_v_documents_and_question,
+    ) = _node_pair(
+        _grade_generation_v_documents_and_question,
+        lambda state: _degrade(state, "deadline"),
+    )
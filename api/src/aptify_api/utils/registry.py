@@ -0,0 +1,123 @@
+"""Process-wide, lazily created retrieval resources."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from .article_indexer import ArticleIndexer
+from .hybrid_search import BM25Index, HybridRetriever
+from .init_vector_db import (
+    ChangeListener,
+    add_change_listener,
+    chroma_collection,
+    get_embeddings,
+    open_vectorstore,
+)
+
+
+class _ChangeBuffer:
+    """Change listener that holds store writes until ``attach`` gives it a target.
+
+    Registered before a snapshot is read, so writes made while the snapshot
+    is built are replayed onto it rather than lost. Replaying a write the
+    snapshot already contains is harmless: upserts replace, removals of
+    missing ids do nothing.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._changes: List[Tuple[List[str], List[Document]]] = []
+        self._target: Optional[ChangeListener] = None
+
+    def __call__(self, removed: List[str], added: List[Document]) -> None:
+        with self._lock:
+            if self._target is None:
+                self._changes.append((removed, added))
+                return
+            target = self._target
+        target(removed, added)
+
+    def attach(self, target: ChangeListener) -> None:
+        with self._lock:
+            for removed, added in self._changes:
+                target(removed, added)
+            self._changes.clear()
+            self._target = target
+
+
+class ResourceRegistry:
+    """Builds the embedding model, Chroma client and retriever once per process.
+
+    Every consumer (the startup hook, the RAG graph, the answer cache) asks
+    the registry instead of opening its own copy, so a worker holds a single
+    model in memory and opens the store once.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._vectorstore: Optional[Any] = None
+        self._bm25_index: Optional[BM25Index] = None
+        self._retriever: Optional[Any] = None
+        self._article_indexer: Optional[ArticleIndexer] = None
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return get_embeddings()
+
+    @property
+    def vectorstore(self) -> Any:
+        if self._vectorstore is None:
+            with self._lock:
+                if self._vectorstore is None:
+                    self._vectorstore = open_vectorstore()
+        return self._vectorstore
+
+    @property
+    def bm25_index(self) -> BM25Index:
+        if self._bm25_index is None:
+            with self._lock:
+                if self._bm25_index is None:
+                    # BM25 over the same chunks as Chroma, kept in step with writes.
+                    changes = _ChangeBuffer()
+                    add_change_listener(changes)
+                    index = BM25Index.from_collection(chroma_collection(self.vectorstore))
+                    changes.attach(index.apply_change)
+                    self._bm25_index = index
+        return self._bm25_index
+
+    @property
+    def retriever(self) -> Any:
+        if self._retriever is None:
+            with self._lock:
+                if self._retriever is None:
+                    if os.getenv("RETRIEVAL_MODE", "hybrid") == "hybrid":
+                        self._retriever = HybridRetriever(
+                            vectorstore=self.vectorstore, index=self.bm25_index
+                        )
+                    else:
+                        self._retriever = self.vectorstore.as_retriever()
+        return self._retriever
+
+    @property
+    def article_indexer(self) -> ArticleIndexer:
+        if self._article_indexer is None:
+            with self._lock:
+                if self._article_indexer is None:
+                    # Writes go to the shared store, so BM25 and the answer
+                    # cache see new articles through the change listeners.
+                    self._article_indexer = ArticleIndexer(lambda: self.vectorstore)
+        return self._article_indexer
+
+    def close(self) -> None:
+        """Let background writers finish before the process exits."""
+
+        if self._article_indexer is not None:
+            self._article_indexer.stop()
+
+
+RESOURCES = ResourceRegistry()
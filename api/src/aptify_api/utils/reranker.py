@@ -0,0 +1,73 @@
+"""Local cross-encoder reranking as a fast stand-in for LLM relevance grading."""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """Score (question, chunk) pairs in one batched forward pass.
+
+    Keeps at most ``top_k`` documents whose score reaches ``threshold``. The
+    default ms-marco model emits logits, so ``0.0`` is roughly "more likely
+    relevant than not". The model is loaded on first use.
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANKER_MODEL,
+        top_k: int = 4,
+        threshold: float = 0.0,
+        max_length: int = 512,
+    ) -> None:
+        self.model_name = model_name
+        self.top_k = top_k
+        self.threshold = threshold
+        self.max_length = max_length
+        self._model: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "CrossEncoderReranker":
+        return cls(
+            model_name=os.getenv("RERANKER_MODEL", DEFAULT_RERANKER_MODEL),
+            top_k=int(os.getenv("RERANKER_TOP_K", "4")),
+            threshold=float(os.getenv("RERANKER_THRESHOLD", "0.0")),
+        )
+
+    @property
+    def model(self) -> Any:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(
+                        self.model_name, max_length=self.max_length, device="cpu"
+                    )
+        return self._model
+
+    def score(self, question: str, documents: List[Document]) -> List[float]:
+        if not documents:
+            return []
+        pairs = [(question, document.page_content) for document in documents]
+        scores = self.model.predict(pairs, batch_size=len(pairs))
+        return [float(score) for score in scores]
+
+    def rerank(
+        self, question: str, documents: List[Document]
+    ) -> List[Tuple[Document, float]]:
+        """Return the kept documents with their scores, best first."""
+
+        scored = sorted(
+            zip(documents, self.score(question, documents)),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return [item for item in scored if item[1] >= self.threshold][: self.top_k]
@@ -0,0 +1,242 @@
+"""Per-request spans and process-wide latency histograms for the RAG graph."""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from itertools import accumulate
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Node and edge handlers are registered as ``rag_nodes.<name>`` runnables.
+SPAN_PREFIX = "rag_nodes."
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+@dataclass
+class Span:
+    """Timing and LLM usage for one execution of a graph node or edge."""
+
+    name: str
+    started: float
+    duration_ms: Optional[float] = None
+    llm_calls: int = 0
+    prompt_chars: int = 0
+    completion_chars: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration_ms": round(self.duration_ms or 0.0, 2),
+            "llm_calls": self.llm_calls,
+            "prompt_chars": self.prompt_chars,
+            "completion_chars": self.completion_chars,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+def _token_counts(response: Any) -> tuple:
+    """Best-effort (prompt, completion) token counts from an LLMResult."""
+
+    prompt = completion = 0
+    for generations in getattr(response, "generations", []) or []:
+        for generation in generations:
+            info = getattr(generation, "generation_info", None) or {}
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None) or {}
+            # Ollama reports prompt_eval_count/eval_count; chat models usage_metadata.
+            prompt += info.get("prompt_eval_count") or usage.get("input_tokens") or 0
+            completion += info.get("eval_count") or usage.get("output_tokens") or 0
+    return prompt, completion
+
+
+def _completion_chars(response: Any) -> int:
+    return sum(
+        len(getattr(generation, "text", "") or "")
+        for generations in getattr(response, "generations", []) or []
+        for generation in generations
+    )
+
+
+class RagTrace(BaseCallbackHandler):
+    """Callback handler that turns one graph run into a list of spans.
+
+    Pass it in ``config={"callbacks": [trace]}``. LLM calls are attributed
+    to the nearest enclosing node or edge span by walking parent run ids.
+    """
+
+    run_inline = True
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.spans: List[Span] = []
+        self._open: Dict[UUID, Span] = {}
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._lock = threading.Lock()
+
+    def _span_for(self, run_id: Optional[UUID]) -> Optional[Span]:
+        while run_id is not None:
+            span = self._open.get(run_id)
+            if span is not None:
+                return span
+            run_id = self._parents.get(run_id)
+        return None
+
+    def on_chain_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = kwargs.get("name") or (serialized or {}).get("name") or ""
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            if name.startswith(SPAN_PREFIX):
+                span = Span(name=name[len(SPAN_PREFIX) :], started=time.perf_counter())
+                self._open[run_id] = span
+                self.spans.append(span)
+
+    def _close(self, run_id: UUID) -> None:
+        with self._lock:
+            span = self._open.pop(run_id, None)
+            if span is not None:
+                span.duration_ms = (time.perf_counter() - span.started) * 1000
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._close(run_id)
+
+    def _llm_start(self, run_id: UUID, parent_run_id: Optional[UUID], chars: int) -> None:
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            span = self._span_for(parent_run_id)
+            if span is not None:
+                span.llm_calls += 1
+                span.prompt_chars += chars
+
+    def on_llm_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        prompts: List[str],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._llm_start(run_id, parent_run_id, sum(len(prompt) for prompt in prompts))
+
+    def on_chat_model_start(
+        self,
+        serialized: Optional[Dict[str, Any]],
+        messages: List[List[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> None:
+        chars = sum(
+            len(str(getattr(message, "content", "")))
+            for batch in messages
+            for message in batch
+        )
+        self._llm_start(run_id, parent_run_id, chars)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = _token_counts(response)
+        with self._lock:
+            span = self._span_for(self._parents.get(run_id))
+            if span is not None:
+                span.completion_chars += _completion_chars(response)
+                span.prompt_tokens += prompt_tokens
+                span.completion_tokens += completion_tokens
+
+    def finish(self) -> None:
+        self.finished = time.perf_counter()
+
+    @property
+    def total_ms(self) -> float:
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return (end - self.started) * 1000
+
+    def summary(self) -> Dict[str, Any]:
+        """Spans plus per-node iteration counts, suitable for a response body."""
+
+        with self._lock:
+            spans = [span.as_dict() for span in self.spans]
+        iterations: Dict[str, int] = {}
+        for span in spans:
+            iterations[span["name"]] = iterations.get(span["name"], 0) + 1
+        return {
+            "total_ms": round(self.total_ms, 2),
+            "llm_calls": sum(span["llm_calls"] for span in spans),
+            "iterations": iterations,
+            "spans": spans,
+        }
+
+
+@dataclass
+class _Histogram:
+    counts: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    total_ms: float = 0.0
+    llm_calls: int = 0
+
+    def observe(self, value_ms: float, llm_calls: int = 0) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, value_ms)] += 1
+        self.total_ms += value_ms
+        self.llm_calls += llm_calls
+
+
+class LatencyHistograms:
+    """Process-wide per-span latency histograms fed by finished traces."""
+
+    def __init__(self) -> None:
+        self._histograms: Dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value_ms: float, llm_calls: int = 0) -> None:
+        with self._lock:
+            self._histograms.setdefault(name, _Histogram()).observe(value_ms, llm_calls)
+
+    def record(self, trace: RagTrace, name: str = "request") -> None:
+        """Add a finished request and each of its spans."""
+
+        summary = trace.summary()
+        self.observe(name, summary["total_ms"], summary["llm_calls"])
+        for span in summary["spans"]:
+            self.observe(span["name"], span["duration_ms"], span["llm_calls"])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-name counts, mean and cumulative ``le_<ms>`` buckets.
+
+        As in Prometheus, each bucket counts every observation at or below
+        its bound, so ``le_inf`` equals ``count``.
+        """
+
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        with self._lock:
+            return {
+                name: {
+                    "count": sum(histogram.counts),
+                    "mean_ms": round(histogram.total_ms / max(sum(histogram.counts), 1), 2),
+                    "llm_calls": histogram.llm_calls,
+                    "buckets": dict(zip(labels, accumulate(histogram.counts))),
+                }
+                for name, histogram in sorted(self._histograms.items())
+            }
+
+
+RAG_METRICS = LatencyHistograms()
@@ -0,0 +1,191 @@
+"""Web search backends for the RAG graph, with a result cache and context budget."""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+from langchain_core.runnables import RunnableConfig
+
+from .context_packer import CHARS_PER_TOKEN
+
+SearchResults = List[Dict[str, Any]]
+
+
+class WebSearch(ABC):
+    """Interface the ``web_search`` node depends on.
+
+    ``search`` returns Tavily-shaped result dicts with at least ``content``
+    (and usually ``url``). ``asearch`` defaults to running ``search`` in a
+    worker thread.
+    """
+
+    @abstractmethod
+    def search(self, query: str) -> SearchResults:
+        ...
+
+    async def asearch(
+        self, query: str, config: Optional[RunnableConfig] = None
+    ) -> SearchResults:
+        return await asyncio.to_thread(self.search, query)
+
+
+def _results(docs: Any) -> SearchResults:
+    if isinstance(docs, dict):
+        docs = docs.get("results", [])
+    if not isinstance(docs, list):
+        return []
+    return [item for item in docs if isinstance(item, dict)]
+
+
+class TavilyWebSearch(WebSearch):
+    """Adapt a LangChain search tool such as ``TavilySearch``."""
+
+    def __init__(self, tool: Any) -> None:
+        self.tool = tool
+
+    def search(self, query: str) -> SearchResults:
+        return _results(self.tool.invoke({"query": query}))
+
+    async def asearch(
+        self, query: str, config: Optional[RunnableConfig] = None
+    ) -> SearchResults:
+        return _results(await self.tool.ainvoke({"query": query}, config=config))
+
+
+class StubWebSearch(WebSearch):
+    """Offline stand-in returning canned results after an optional delay."""
+
+    def __init__(
+        self,
+        results: Optional[Dict[str, SearchResults]] = None,
+        latency_seconds: float = 0.0,
+        k: int = 3,
+    ) -> None:
+        self.results = results or {}
+        self.latency_seconds = latency_seconds
+        self.k = k
+        self.calls = 0
+
+    def _lookup(self, query: str) -> SearchResults:
+        self.calls += 1
+        if query in self.results:
+            return list(self.results[query])
+        return [
+            {"url": f"https://example.com/{index}", "content": f"Result {index}: {query}"}
+            for index in range(self.k)
+        ]
+
+    def search(self, query: str) -> SearchResults:
+        time.sleep(self.latency_seconds)
+        return self._lookup(query)
+
+    async def asearch(
+        self, query: str, config: Optional[RunnableConfig] = None
+    ) -> SearchResults:
+        await asyncio.sleep(self.latency_seconds)
+        return self._lookup(query)
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace/punctuation so trivial variants share a key."""
+
+    return " ".join(re.findall(r"\w+", query.casefold()))
+
+
+class CachedWebSearch(WebSearch):
+    """LRU + TTL cache in front of another ``WebSearch``, keyed by normalized query."""
+
+    def __init__(
+        self,
+        backend: WebSearch,
+        ttl_seconds: float = 900.0,
+        max_entries: int = 256,
+    ) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, SearchResults]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: str) -> Optional[SearchResults]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def _put(self, key: str, results: SearchResults) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def search(self, query: str) -> SearchResults:
+        key = normalize_query(query)
+        results = self._get(key)
+        if results is None:
+            results = self.backend.search(query)
+            self._put(key, results)
+        return results
+
+    async def asearch(
+        self, query: str, config: Optional[RunnableConfig] = None
+    ) -> SearchResults:
+        key = normalize_query(query)
+        results = self._get(key)
+        if results is None:
+            results = await self.backend.asearch(query, config=config)
+            self._put(key, results)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def results_document(results: SearchResults, max_tokens: Optional[int] = None) -> Document:
+    """Join results into one ``Document``, dropping duplicates and capping its size.
+
+    Results repeating an earlier URL or (whitespace-normalized) content are
+    skipped. With ``max_tokens`` the joined text is cut at a word boundary
+    once it reaches roughly that many tokens, so the ``generate`` and
+    hallucination-grader prompts stay bounded.
+    """
+
+    seen_urls = set()
+    seen_content = set()
+    parts: List[str] = []
+    sources: List[str] = []
+    for item in results:
+        content = " ".join(str(item.get("content") or "").split())
+        url = item.get("url")
+        if not content or content in seen_content or (url and url in seen_urls):
+            continue
+        seen_content.add(content)
+        if url:
+            seen_urls.add(url)
+            sources.append(url)
+        parts.append(content)
+
+    text = "\n\n".join(parts)
+    if max_tokens is not None and len(text) > max_tokens * CHARS_PER_TOKEN:
+        text = text[: max_tokens * CHARS_PER_TOKEN].rsplit(" ", 1)[0]
+    return Document(
+        page_content=text,
+        metadata={"source": sources[0] if sources else "web_search", "urls": sources},
+    )
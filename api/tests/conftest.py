@@ -0,0 +1,7 @@
+"""Shared test setup for the API package."""
+
+import os
+
+# Importing aptify_api builds the app, and services.rag builds a TavilySearch
+# on import; it is never called by the tests.
+os.environ.setdefault("TAVILY_API_KEY", "offline-tests")
@@ -0,0 +1,83 @@
+"""Cosine parity of the ONNX embedding backends with sentence-transformers.
+
+Skipped unless the ``onnx`` extra is installed and the model files are already
+in the local Hugging Face cache; the test never downloads them::
+
+    uv sync --extra onnx
+    uv run --with pytest pytest tests/test_onnx_embeddings.py
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from huggingface_hub import try_to_load_from_cache  # noqa: E402
+
+from aptify_api.utils.init_vector_db import EMBEDDING_MODEL  # noqa: E402
+from aptify_api.utils.onnx_embeddings import ONNX_FILES, OnnxEmbeddings  # noqa: E402
+
+QUESTIONS = [
+    "Who pays stamp duty on a tenancy agreement?",
+    "How long does the lessor have to lodge the rental bond?",
+    "What notice is needed before entering the premises?",
+    "Can the tenant end a fixed term lease early?",
+    "Who is responsible for routine repairs?",
+]
+CHUNKS = [
+    "The lessor or agent must lodge the rental bond with the RTA within 10 days.",
+    "An entry notice (Form 9) must be given at least 24 hours before entry.",
+    "Tenants are responsible for keeping the premises clean and undamaged.",
+    "Emergency repairs include a burst water service or a dangerous electrical fault.",
+    "A tenant who breaks a fixed term agreement may have to pay reletting costs.",
+    "Stamp duty is not payable on residential tenancy agreements in Queensland.",
+    "The Form 17a pocket guide explains rights and responsibilities for tenants.",
+    "Rent increases require at least two months written notice.",
+]
+
+# (min vector cosine vs torch, max abs difference in query/chunk scores)
+TOLERANCES = {"onnx": (0.999, 0.01), "onnx-int8": (0.97, 0.05)}
+
+REFERENCE_FILES = ("config.json", "tokenizer.json", "model.safetensors")
+
+
+def _cached(file_name: str) -> bool:
+    return isinstance(try_to_load_from_cache(EMBEDDING_MODEL, file_name), str)
+
+
+def _scores(model):
+    queries = np.asarray([model.embed_query(text) for text in QUESTIONS])
+    chunks = np.asarray(model.embed_documents(CHUNKS))
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    chunks /= np.linalg.norm(chunks, axis=1, keepdims=True)
+    return chunks, queries @ chunks.T
+
+
+@pytest.fixture(scope="module")
+def reference():
+    missing = [name for name in REFERENCE_FILES if not _cached(name)]
+    if missing:
+        pytest.skip(f"{EMBEDDING_MODEL} not cached locally: {', '.join(missing)}")
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return _scores(HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL))
+
+
+@pytest.mark.parametrize("backend", sorted(TOLERANCES))
+def test_onnx_backend_matches_sentence_transformers(backend, reference):
+    if not _cached(ONNX_FILES[backend]):
+        pytest.skip(f"{ONNX_FILES[backend]} not cached locally")
+    min_cosine, max_score_delta = TOLERANCES[backend]
+    reference_vectors, reference_scores = reference
+
+    vectors, scores = _scores(OnnxEmbeddings(EMBEDDING_MODEL, backend=backend))
+
+    cosines = np.sum(vectors * reference_vectors, axis=1)
+    assert cosines.min() >= min_cosine
+    assert np.abs(scores - reference_scores).max() <= max_score_delta
+    # Every question still ranks the same chunk first.
+    assert np.array_equal(
+        np.argmax(scores, axis=1), np.argmax(reference_scores, axis=1)
+    )